@@ -0,0 +1,205 @@
+"""
+Synthetic and pathological HTML corpora for the scraper benchmarks.
+
+Every corpus is generated locally and deterministically, a corpus is a function taking
+the approximate document size in bytes and returning the document and the rules to
+scrape it with.
+"""
+
+from jaydee.scraper import ScraperRule
+
+
+def _repeat(block, size: int, head: str = "", tail: str = "") -> str:
+    """Repeats a block generated from its index until the document reaches the size."""
+    parts = [head]
+    total = len(head) + len(tail)
+    index = 0
+
+    while total < size:
+        part = block(index)
+        parts.append(part)
+        total += len(part)
+        index += 1
+
+    parts.append(tail)
+    return "".join(parts)
+
+
+def listing(size: int):
+    """Product listing with cards, the most common shape of scraped pages."""
+    document = _repeat(
+        lambda i: (
+            f'<div class="product" id="product-{i}">'
+            f'<h2 class="name">Product {i}</h2>'
+            f'<div class="details"><span class="price">{i}.99</span>'
+            f'<a href="/products/{i}" class="more">More</a></div>'
+            f"<p>Description of product {i} with some text.</p></div>"
+        ),
+        size,
+        "<html><body><main>",
+        "</main></body></html>",
+    )
+    rules = [
+        ScraperRule(target="names", attributes={"element": "h2", "class_name": "name"}),
+        ScraperRule(
+            target="prices",
+            attributes={
+                "element": "span",
+                "class_name": "price",
+                "child_of": {
+                    "element": "div",
+                    "class_name": "details",
+                    "child_of": {"element": "div", "class_name": "product"},
+                },
+            },
+        ),
+        ScraperRule(
+            target="links",
+            attributes={
+                "element": "a",
+                "property": "href",
+                "child_of": {"class_name": "product"},
+            },
+        ),
+        ScraperRule(target="descriptions", select="div.product > p"),
+    ]
+
+    return document, rules
+
+
+def deep_nesting(size: int, depth: int = 200):
+    """Blocks of deeply nested divs."""
+    opening = "".join(f'<div class="level-{d % 10}">' for d in range(depth))
+    closing = "</div>" * depth
+
+    document = _repeat(
+        lambda i: f'{opening}<span class="leaf">Leaf {i}</span>{closing}',
+        size,
+        "<html><body>",
+        "</body></html>",
+    )
+    rules = [
+        ScraperRule(
+            target="leaves",
+            attributes={
+                "element": "span",
+                "class_name": "leaf",
+                "child_of": {"element": "div", "class_name": "level-9"},
+            },
+        ),
+        ScraperRule(
+            target="outer", attributes={"element": "div", "class_name": "level-0"}
+        ),
+    ]
+
+    return document, rules
+
+
+def wide_table(size: int, columns: int = 100):
+    """A data table export with many columns."""
+    document = _repeat(
+        lambda i: "<tr>"
+        + "".join(f'<td class="c{c}">{i * columns + c}</td>' for c in range(columns))
+        + "</tr>",
+        size,
+        '<html><body><table class="data"><tbody>',
+        "</tbody></table></body></html>",
+    )
+    rules = [
+        ScraperRule(
+            target="first",
+            attributes={
+                "element": "td",
+                "class_name": "c0",
+                "child_of": {
+                    "element": "tr",
+                    "child_of": {"element": "table", "class_name": "data"},
+                },
+            },
+        ),
+        ScraperRule(target="cells", attributes={"element": "td"}),
+    ]
+
+    return document, rules
+
+
+def child_of_chain(size: int, levels: int = 10):
+    """Nested containers scraped with a rule that has many child_of levels."""
+    opening = "".join(f'<div class="s{d}">' for d in range(levels))
+    closing = "</div>" * levels
+
+    document = _repeat(
+        lambda i: f'{opening}<p class="value">Value {i}</p>{closing}',
+        size,
+        "<html><body>",
+        "</body></html>",
+    )
+
+    child_of = None
+    for d in range(levels):
+        child_of = {"element": "div", "class_name": f"s{d}", "child_of": child_of}
+
+    rules = [
+        ScraperRule(
+            target="values",
+            attributes={"element": "p", "class_name": "value", "child_of": child_of},
+        )
+    ]
+
+    return document, rules
+
+
+def many_selects(size: int, count: int = 50):
+    """A listing scraped with many CSS selector rules."""
+    document, _ = listing(size)
+    rules = [
+        ScraperRule(target=f"select-{i}", select=f"#product-{i} > div.details a.more")
+        for i in range(count)
+    ]
+
+    return document, rules
+
+
+def script_heavy(size: int):
+    """A listing where most of the markup is scripts, styles and SVG."""
+    script = (
+        "<script>" + "window.data.push({id: 1, tags: ['a', 'b']});" * 200 + "</script>"
+    )
+    style = "<style>" + ".item { margin: 0 auto; padding: 4px; }" * 100 + "</style>"
+    svg = "<svg>" + '<path d="M0 0 L10 10 L20 0 Z"></path>' * 50 + "</svg>"
+
+    document = _repeat(
+        lambda i: (
+            f"{script}{svg}"
+            f'<div class="product"><h2>Product {i}</h2><a href="/p/{i}">More</a></div>'
+        ),
+        size,
+        f"<html><head>{style}</head><body>",
+        "</body></html>",
+    )
+    rules = [
+        ScraperRule(
+            target="names",
+            attributes={"element": "h2", "child_of": {"class_name": "product"}},
+        ),
+        ScraperRule(
+            target="links",
+            attributes={
+                "element": "a",
+                "property": "href",
+                "child_of": {"class_name": "product"},
+            },
+        ),
+    ]
+
+    return document, rules
+
+
+CORPORA = {
+    "listing": listing,
+    "deep_nesting": deep_nesting,
+    "wide_table": wide_table,
+    "child_of_chain": child_of_chain,
+    "many_selects": many_selects,
+    "script_heavy": script_heavy,
+}
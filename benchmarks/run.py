@@ -0,0 +1,174 @@
+"""
+Runs the scraper benchmark suite and writes the results as JSON.
+
+Every case scrapes a generated corpus with one of the option variants in a fresh
+process, so the peak memory of one case doesn't carry over to the next.
+
+Run with:
+
+    $ poetry run python benchmarks/run.py --output results.json
+    $ poetry run python benchmarks/run.py --max-size 50MB --parser lxml
+    $ poetry run python benchmarks/run.py --compare before.json after.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from importlib.metadata import version
+
+from corpora import CORPORA
+
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper
+
+SIZES = {
+    "10KB": 10 * 1024,
+    "100KB": 100 * 1024,
+    "1MB": 1024 * 1024,
+    "10MB": 10 * 1024 * 1024,
+    "50MB": 50 * 1024 * 1024,
+}
+
+VARIANTS = {
+    "default": {},
+    "single_pass": {"single_pass": True},
+    "restrict_parse": {"restrict_parse": True},
+}
+
+
+def run_case(corpus: str, size: int, variant: str, parser: str, repeats: int) -> dict:
+    """Scrapes a corpus and measures the throughput and the peak memory."""
+    logging.getLogger("jd-scraper").setLevel(logging.ERROR)
+
+    document, rules = CORPORA[corpus](size)
+    options = ScraperOptions(parser=parser, **VARIANTS[variant])
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        Scraper(html_doc=document, rules=rules, options=options).scrape()
+        timings.append(time.perf_counter() - start)
+
+    # Tracing slows down scraping, so memory is measured with a separate run.
+    tracemalloc.start()
+    Scraper(html_doc=document, rules=rules, options=options).scrape()
+    _, peak_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    megabytes = len(document.encode("utf-8")) / (1024 * 1024)
+
+    return {
+        "corpus": corpus,
+        "variant": variant,
+        "parser": parser,
+        "bytes": len(document.encode("utf-8")),
+        "rules": len(rules),
+        "repeats": repeats,
+        "best_s": best,
+        "mean_s": sum(timings) / len(timings),
+        "docs_per_s": 1 / best,
+        "mb_per_s": megabytes / best,
+        "peak_python_mb": peak_python / (1024 * 1024),
+        # ru_maxrss is reported in kilobytes on Linux.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_isolated(*args) -> dict:
+    """Runs a case in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, args)
+
+
+def compare(before_path: str, after_path: str):
+    """Prints the throughput ratio of every case present in both result files."""
+    with open(before_path) as file:
+        before = json.load(file)
+    with open(after_path) as file:
+        after = json.load(file)
+
+    def key(result):
+        return (result["corpus"], result["bytes"], result["variant"], result["parser"])
+
+    previous = {key(result): result for result in before["results"]}
+
+    print(f"{'case':60} {'MB/s before':>12} {'MB/s after':>12} {'ratio':>7}")
+    for result in after["results"]:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+
+        name = "/".join(str(part) for part in key(result))
+        ratio = result["mb_per_s"] / old["mb_per_s"]
+        print(
+            f"{name:60} {old['mb_per_s']:12.2f} {result['mb_per_s']:12.2f} {ratio:7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper benchmark suite.")
+    parser.add_argument("--output", help="path of the JSON results file")
+    parser.add_argument("--parser", default="html5lib", help="parser backend")
+    parser.add_argument(
+        "--max-size", default="1MB", choices=SIZES.keys(), help="largest document"
+    )
+    parser.add_argument("--corpus", action="append", choices=CORPORA.keys())
+    parser.add_argument("--variant", action="append", choices=VARIANTS.keys())
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    limit = SIZES[args.max_size]
+    sizes = {name: size for name, size in SIZES.items() if size <= limit}
+
+    results = []
+    for corpus in args.corpus or CORPORA.keys():
+        for size_name, size in sizes.items():
+            for variant in args.variant or VARIANTS.keys():
+                # Larger documents are scraped once to keep the suite reasonably fast.
+                repeats = args.repeats if size <= SIZES["1MB"] else 1
+
+                result = run_isolated(corpus, size, variant, args.parser, repeats)
+                results.append(result)
+
+                print(
+                    f"{corpus:15} {size_name:>6} {variant:15} "
+                    f"{result['docs_per_s']:9.2f} docs/s {result['mb_per_s']:7.2f} MB/s "
+                    f"peak {result['peak_python_mb']:8.1f} MB python "
+                    f"{result['peak_rss_mb']:8.1f} MB rss",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "meta": {
+            "jaydee": version("jaydee"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parser": args.parser,
+            "date": datetime.today().strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares full parsing to parsing restricted with the `restrict_parse` scraper option.
+
+Generates script and SVG heavy product pages and reports the parse and scrape time
+and the peak memory allocated for each parser backend that can restrict parsing.
+
+Run with:
+
+    $ poetry run python benchmarks/strainer.py
+"""
+
+import time
+import tracemalloc
+
+from corpora import script_heavy
+
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper
+from jaydee.strainer import RESTRICTABLE_PARSERS
+
+
+def measure(document: str, rules, options: ScraperOptions) -> tuple[float, int]:
+    """Returns the time and the peak memory of parsing and scraping the document."""
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    Scraper(html_doc=document, rules=rules, options=options).scrape()
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    document, rules = script_heavy(2 * 1024 * 1024)
+    print(f"Document size: {len(document) / 1e6:.1f} MB")
+
+    for parser in RESTRICTABLE_PARSERS:
+        full = measure(document, rules, ScraperOptions(parser=parser))
+        restricted = measure(
+            document, rules, ScraperOptions(parser=parser, restrict_parse=True)
+        )
+
+        print(
+            f"{parser:12} full: {full[0]:.2f}s {full[1] / 1e6:.1f} MB, "
+            f"restricted: {restricted[0]:.2f}s {restricted[1] / 1e6:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from . import __version__
+
+logger = logging.getLogger("jd-cache")
+
+
+def document_hash(document) -> str:
+    """Returns a content hash of a HTML document, a string or any object supporting the buffer protocol."""
+    if isinstance(document, str):
+        document = document.encode("utf-8", "surrogatepass")
+
+    return hashlib.blake2b(document, digest_size=16).hexdigest()
+
+
+class ParseCache:
+    """
+    A bounded LRU cache of parsed documents keyed by a content hash of the document.
+
+    Assigning a cached document to a scraper only costs hashing the document. The cache
+    is bounded by the amount of entries and by an approximate size in bytes, which is
+    measured as the size of the source documents. Parsed trees typically take several
+    times the size of their source.
+
+    The cache is thread-safe and is shared rather than copied when a scraper is copied,
+    so the scrapers of a WebScraper and a LinkCrawler can share one. Cached trees are
+    shared by every scraper using the cache and must not be modified.
+
+    Args:
+        max_entries: the maximum amount of parsed documents kept in the cache.
+        max_bytes: the maximum total size of the cached documents.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached tree for the key or None, marking it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, tree, size: int):
+        """Stores a tree in the cache, evicting the least recently used trees when full."""
+        if size > self.max_bytes:
+            logger.info("Document is larger than the parse cache, not caching.")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (tree, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Removes all the cached trees."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def __deepcopy__(self, memo):
+        # Copies of a scraper share the cache.
+        return self
+
+    def __reduce__(self):
+        # Parsed trees are not sent to other processes, only the limits.
+        return (ParseCache, (self.max_entries, self.max_bytes))
+
+
+def _default_rule_cache_directory() -> str:
+    """Returns the rule cache directory in the cache directory of the current user."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(cache_home, "jaydee", "rules")
+
+
+def _is_private(status: os.stat_result) -> bool:
+    """Checks that a file is owned by the current user and not writable by others."""
+    # Ownership isn't available on every platform.
+    if not hasattr(os, "getuid"):
+        return True
+
+    return status.st_uid == os.getuid() and not status.st_mode & (
+        stat.S_IWGRP | stat.S_IWOTH
+    )
+
+
+class RuleSetCache:
+    """
+    A persistent cache of rule sets loaded from JSON files.
+
+    The validated rules and their compiled plans are pickled into the cache directory,
+    so loading a rule file that hasn't changed skips parsing and validating the JSON and
+    compiling the rules. An entry is keyed by the path of the rule file and is valid while
+    the modification time and size of the file match, or when the content hash matches
+    after the file was touched without changes.
+
+    Entries are only read back by the same version of the package. Since entries are
+    unpickled, the cache directory is created private to the current user, and entries
+    are neither read from nor written to a directory, or read from a file, that is owned
+    by another user or writable by others.
+
+    Args:
+        directory: the directory the entries are written to, defaults to `jaydee/rules`
+                   in the cache directory of the user, `$XDG_CACHE_HOME` or `~/.cache`.
+    """
+
+    def __init__(self, directory: str | None = None):
+        if directory is None:
+            directory = _default_rule_cache_directory()
+
+        self.directory = directory
+
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: str, allow_unknown_tags: bool):
+        """
+        Loads the compiled rule set of a rule file.
+
+        Args:
+            path: the path of the JSON rule file.
+            allow_unknown_tags: whether the rules may use unknown tags, rule sets validated
+                                with unknown tags allowed are not valid otherwise.
+        Returns:
+            list of (rule, plan) pairs, None if the rule file has no valid entry.
+        """
+        entry = self.__read_entry(path)
+
+        if entry is None or (entry["allow_unknown_tags"] and not allow_unknown_tags):
+            self.misses += 1
+            return None
+
+        stat = os.stat(path)
+        if (entry["mtime_ns"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+            with open(path, "rb") as file:
+                if document_hash(file.read()) != entry["hash"]:
+                    self.misses += 1
+                    return None
+
+            # Unchanged contents, refresh the entry so the next load skips hashing.
+            self.__write_entry(path, dict(entry, mtime_ns=stat.st_mtime_ns))
+
+        self.hits += 1
+        return entry["rules"]
+
+    def store(self, path: str, content: bytes, rules: list, allow_unknown_tags: bool):
+        """
+        Stores the compiled rule set of a rule file.
+
+        Args:
+            path: the path of the JSON rule file.
+            content: the contents of the rule file the rules were loaded from.
+            rules: list of (rule, plan) pairs.
+            allow_unknown_tags: whether the rules were validated with unknown tags allowed.
+        """
+        stat = os.stat(path)
+
+        # The file changed after it was read.
+        if stat.st_size != len(content):
+            return
+
+        entry = {
+            "version": __version__,
+            "path": os.path.abspath(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": document_hash(content),
+            "allow_unknown_tags": allow_unknown_tags,
+            "rules": rules,
+        }
+
+        self.__write_entry(path, entry)
+
+    def clear(self):
+        """Removes all the cached rule sets."""
+        if not os.path.isdir(self.directory):
+            return
+
+        for name in os.listdir(self.directory):
+            if name.endswith(".rules"):
+                os.remove(os.path.join(self.directory, name))
+
+    def __entry_path(self, path: str) -> str:
+        """Returns the path of the entry of a rule file."""
+        name = document_hash(os.path.abspath(path))
+        return os.path.join(self.directory, f"{name}.rules")
+
+    def __read_entry(self, path: str) -> dict | None:
+        """Reads the entry of a rule file, None if it doesn't exist or is unusable."""
+        try:
+            if not _is_private(os.stat(self.directory)):
+                logger.warning(
+                    f"Rule cache directory: {self.directory} is not private to the current user, not reading from it."
+                )
+                return None
+
+            with open(self.__entry_path(path), "rb") as file:
+                if not _is_private(os.fstat(file.fileno())):
+                    logger.warning(
+                        f"Cached rule set of: {path} is not private to the current user, not reading it."
+                    )
+                    return None
+
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read the cached rule set of: {path}")
+            logger.warning(e)
+            return None
+
+        if entry.get("version") != __version__ or entry.get("path") != os.path.abspath(
+            path
+        ):
+            return None
+
+        return entry
+
+    def __write_entry(self, path: str, entry: dict):
+        """Writes an entry atomically so concurrent processes never read a partial entry."""
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+            if not _is_private(os.stat(self.directory)):
+                logger.warning(
+                    f"Rule cache directory: {self.directory} is not private to the current user, not caching."
+                )
+                return
+
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+                os.replace(temp_path, self.__entry_path(path))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Failed to cache the rule set of: {path}")
+            logger.warning(e)
+
+
+class ResultCache:
+    """
+    A persistent cache of scrape results in a SQLite database.
+
+    Results are keyed by the content hash of the document and a hash of the rule set,
+    see `rule_set_hash`, so changing the rules or the options that affect the results
+    invalidates the cached results of the previous rule set. A scraper with a result cache
+    returns the cached result of an unchanged document without parsing it.
+
+    The cache is bounded by the total size of the stored results, the least recently used
+    results are evicted first. It can be shared between threads and processes.
+
+    Args:
+        path: the path of the SQLite database, created when it doesn't exist.
+        max_bytes: the maximum total size of the stored results.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+        with self._lock, self._connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    document_hash TEXT NOT NULL,
+                    rule_set_hash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (document_hash, rule_set_hash)
+                )
+                """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)"
+            )
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, document_hash: str, rule_set_hash: str) -> dict | None:
+        """Returns the cached result or None, marking it as recently used."""
+        key = (document_hash, rule_set_hash)
+
+        with self._lock, self._connection as connection:
+            row = connection.execute(
+                "SELECT result FROM results WHERE document_hash = ? AND rule_set_hash = ?",
+                key,
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            connection.execute(
+                "UPDATE results SET accessed = ? WHERE document_hash = ? AND rule_set_hash = ?",
+                (time.time(), *key),
+            )
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, document_hash: str, rule_set_hash: str, result: dict):
+        """Stores a result, evicting the least recently used results when full."""
+        data = json.dumps(result)
+        size = len(data)
+
+        if size > self.max_bytes:
+            logger.info("Result is larger than the result cache, not caching.")
+            return
+
+        with self._lock, self._connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (document_hash, rule_set_hash, data, size, time.time()),
+            )
+
+            total = connection.execute("SELECT SUM(size) FROM results").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            rows = connection.execute(
+                "SELECT rowid, size FROM results ORDER BY accessed"
+            ).fetchall()
+
+            evicted = []
+            for rowid, row_size in rows:
+                if total <= self.max_bytes:
+                    break
+
+                evicted.append((rowid,))
+                total -= row_size
+
+            connection.executemany("DELETE FROM results WHERE rowid = ?", evicted)
+            self.evictions += len(evicted)
+
+    def clear(self):
+        """Removes all the cached results."""
+        with self._lock, self._connection as connection:
+            connection.execute("DELETE FROM results")
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[
+                0
+            ]
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            total = self._connection.execute("SELECT SUM(size) FROM results").fetchone()
+            return total[0] or 0
+
+    def __deepcopy__(self, memo):
+        # Copies of a scraper share the cache.
+        return self
+
+    def __reduce__(self):
+        # Other processes open their own connection to the same database.
+        return (ResultCache, (self.path, self.max_bytes))
+
+
+def rule_set_hash(rules: list, configuration: dict) -> str:
+    """
+    Returns a hash of a rule set that is stable between processes.
+
+    Args:
+        rules: the rules in the order they are evaluated.
+        configuration: the options that affect the results, such as the parser backend.
+    Returns:
+        the hash of the rules, the configuration and the version of the package.
+    """
+    data = json.dumps(
+        {
+            "version": __version__,
+            "rules": [rule.to_dict() for rule in rules],
+            "configuration": configuration,
+        },
+        sort_keys=True,
+    )
+
+    return document_hash(data)
@@ -3,6 +3,7 @@ from jaydee.scraper import Scraper, ScraperRule
 from jaydee.webscraper import WebScraper
 from jaydee.options import LinkCrawlerOptions, WebScraperOptions
 from jaydee import utils
+from jaydee.stats import RequestStats
 
 import logging
 from datetime import datetime
@@ -57,6 +58,9 @@ class LinkCrawler(BaseCrawler):
         self._current_result = {}
         self.on_proceed = callback
 
+        # Counters of the requests blocked by the request filter options.
+        self.request_stats = RequestStats()
+
         # keep track of seen urls to avoid scraping/crawling them twice
         self.url_queue = []
         self.seen_urls = set()
@@ -133,8 +137,10 @@ class LinkCrawler(BaseCrawler):
             webscraper_options = WebScraperOptions(
                 wait_for_options=self.options._wait_for_options,
                 multithread_options=self.options._multithread_options,
+                request_filter_options=self.options._request_filter_options,
             )
             webscraper = WebScraper(self.scraper, options=webscraper_options)
+            self.request_stats = webscraper.request_stats
             await webscraper.start()
 
             while self.running and self.url_queue:
@@ -182,6 +188,9 @@ class LinkCrawler(BaseCrawler):
                         user_agent=utils.get_random_user_agent(),
                         viewport={"width": 1920, "height": 1080},
                     )
+                    await self.options._request_filter_options.async_install(
+                        context, self.request_stats
+                    )
 
                     url = self.url_queue.pop()
                     fetch_res = await fetch(context, url)
@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from .inputs import DocumentSource, as_markup, open_source, read_source, source_size
+from .options.scraper import DEFAULT_PARSER
+
+logger = logging.getLogger("jd-document")
+
+
+class Document:
+    """
+    A HTML document that is parsed once and can be scraped by many scrapers.
+
+    The document is parsed lazily the first time its tree is needed. Scraping only reads
+    the tree, so scrapers in different threads can scrape the same document at once,
+    each thread using its own scraper. The tree must not be modified.
+
+    Documents are always parsed fully, the `restrict_parse` option of the scrapers
+    doesn't apply to them, and they are parsed with their own parser backend regardless
+    of the parser in the options of the scrapers.
+
+    Args:
+        source: the HTML document, see the `html_doc` argument of the scraper for the accepted types.
+        parser: the tree builder BeautifulSoup parses the document with.
+    Raises:
+        ValueError: when the parser backend is not available.
+    """
+
+    def __init__(self, source: DocumentSource, parser: str = DEFAULT_PARSER):
+        if builder_registry.lookup(parser) is None:
+            raise ValueError(
+                f"Parser backend: {parser} is not available, make sure it is installed or use one of html5lib, lxml or html.parser."
+            )
+
+        self._source = read_source(source)
+        self._parser = parser
+        self._tree = None
+        self._lock = threading.Lock()
+
+        # Time it took to parse the document, zero until it is parsed.
+        self.parse_time = 0.0
+
+    @property
+    def tree(self) -> BeautifulSoup:
+        """The parsed document, parsed on first access."""
+        tree = self._tree
+        if tree is not None:
+            return tree
+
+        with self._lock:
+            # Another thread may have parsed the document while waiting for the lock.
+            if self._tree is None:
+                start = time.perf_counter()
+
+                with open_source(self._source) as (markup, encoding):
+                    self._tree = BeautifulSoup(
+                        as_markup(markup), self._parser, from_encoding=encoding
+                    )
+
+                self.parse_time = time.perf_counter() - start
+                logger.info(f"Parsed document in {self.parse_time:.3f}s")
+
+            return self._tree
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._tree is not None
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def parser(self) -> str:
+        return self._parser
+
+    @property
+    def size(self) -> int:
+        """The length of the source document."""
+        return source_size(self._source)
+
+    def __reduce__(self):
+        # Only the source is sent to other processes, where it is parsed again.
+        return (Document, (self._source, self._parser))
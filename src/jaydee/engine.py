@@ -0,0 +1,214 @@
+from collections import defaultdict
+
+from bs4 import Tag
+
+from .plan import MatchStep, RulePlan
+from .stats import ScrapeStats
+
+
+class _Level:
+    """
+    A unique prefix of a `child_of` chain.
+
+    A tag satisfies a level when it matches the levels step and one of its
+    ancestors satisfies the parent level.
+    """
+
+    __slots__ = ("index", "step", "parent", "targets")
+
+    def __init__(self, index: int, step: MatchStep, parent: "_Level | None"):
+        self.index = index
+        self.step = step
+        self.parent = parent
+
+        # Targets of the rules whose final step is this level.
+        self.targets = []
+
+
+class TraversalEngine:
+    """
+    Evaluates a set of compiled rule plans with a single walk over the document.
+
+    Every step of every rule is indexed by id, class name or element. While walking
+    the tree each tag is only tested against the steps it can possibly satisfy, and
+    `child_of` constraints are tracked with counters of the currently open ancestors
+    that satisfy each level. The cost therefore grows with the size of the document
+    rather than the number of rules times the size of the document.
+
+    Rules that use CSS selectors can't be indexed and are evaluated separately.
+
+    Args:
+        plans: the compiled plans of the rules to evaluate.
+    """
+
+    def __init__(self, plans: list[RulePlan]):
+        self._targets = [plan.target for plan in plans]
+        self._selects = [plan for plan in plans if plan.select is not None]
+
+        self._levels = []
+        self._by_id = defaultdict(list)
+        self._by_class = defaultdict(list)
+        self._by_element = defaultdict(list)
+        self._any = []
+
+        # Rules sharing a chain prefix share the levels of that prefix.
+        levels = {}
+
+        for plan in plans:
+            if plan.select is not None:
+                continue
+
+            parent = None
+            chain = plan.scope_steps + (plan.step,)
+            for depth in range(1, len(chain) + 1):
+                key = chain[:depth]
+
+                if key not in levels:
+                    levels[key] = self.__add_level(chain[depth - 1], parent)
+
+                parent = levels[key]
+
+            parent.targets.append(plan.target)
+
+    def __add_level(self, step: MatchStep, parent: _Level | None) -> _Level:
+        """Creates a level and indexes it by its most selective key."""
+        level = _Level(len(self._levels), step, parent)
+        self._levels.append(level)
+
+        if step.ids is not None:
+            for id in step.ids:
+                self._by_id[id].append(level)
+        elif step.class_names is not None:
+            for class_name in step.class_names:
+                self._by_class[class_name].append(level)
+        elif step.element is not None:
+            self._by_element[step.element].append(level)
+        else:
+            self._any.append(level)
+
+        return level
+
+    def __candidates(self, tag) -> list[_Level]:
+        """Returns the levels the given tag could satisfy."""
+        candidates = list(self._any)
+
+        levels = self._by_element.get(tag.name)
+        if levels:
+            candidates.extend(levels)
+
+        id = tag.get("id")
+        if id is not None and id in self._by_id:
+            candidates.extend(self._by_id[id])
+
+        classes = tag.get("class")
+        if classes is not None and self._by_class:
+            if isinstance(classes, str):
+                classes = [classes]
+            elif len(classes) != 1:
+                # BeautifulSoup also matches against the whole class string.
+                classes = classes + [" ".join(classes)]
+
+            for name in classes:
+                levels = self._by_class.get(name)
+                if levels:
+                    candidates.extend(levels)
+
+        return candidates
+
+    @property
+    def level_count(self) -> int:
+        return len(self._levels)
+
+    def match_tag(self, tag, active: list[int]) -> list[_Level]:
+        """
+        Finds the levels an opened tag satisfies.
+
+        Args:
+            tag: the opened tag, anything with a name and a get method for attributes.
+            active: amount of open ancestors satisfying each level.
+        Returns:
+            list of satisfied levels.
+        """
+        satisfied = []
+
+        for level in self.__candidates(tag):
+            if level in satisfied:
+                continue
+
+            if level.parent is not None and not active[level.parent.index]:
+                continue
+
+            if level.step.matches(tag):
+                satisfied.append(level)
+
+        return satisfied
+
+    def run(self, root: Tag, stats: ScrapeStats | None = None) -> dict[str, list[Tag]]:
+        """
+        Walks the document once and collects the matches of every rule.
+
+        Args:
+            root: the root of the parsed document.
+            stats: optional statistics to count the visited elements into.
+        Returns:
+            dictionary of rule targets mapped to the matched elements in document order.
+        """
+        matches = {target: [] for target in self._targets}
+
+        # Amount of open ancestors that satisfy each level.
+        active = [0] * self.level_count
+
+        visited = 0
+        stack = [(iter(root.contents), ())]
+        while stack:
+            children, satisfied = stack[-1]
+            node = next(children, None)
+
+            if node is None:
+                stack.pop()
+                for level in satisfied:
+                    active[level.index] -= 1
+                continue
+
+            if not isinstance(node, Tag):
+                continue
+
+            visited += 1
+            satisfied = self.match_tag(node, active)
+            for level in satisfied:
+                active[level.index] += 1
+                for target in level.targets:
+                    matches[target].append(node)
+
+            stack.append((iter(node.contents), satisfied))
+
+        for plan in self._selects:
+            matches[plan.target] = plan.match(root)
+
+        if stats is not None:
+            stats.engine_nodes_visited += visited
+
+        return matches
+
+
+class RecordPlan(RulePlan):
+    """
+    An execution plan for a record rule.
+
+    The containers are matched like the elements of any other rule, the fields of each
+    container are matched with a single walk over the container by a traversal engine.
+
+    Args:
+        rule: the record rule to compile.
+    Raises:
+        SelectorSyntaxError: when the CSS selector of the rule or a field is invalid.
+    """
+
+    def __init__(self, rule):
+        super().__init__(rule)
+
+        self.fields = [RulePlan(field) for field in rule.fields]
+        self.engine = TraversalEngine(self.fields)
+
+        # Records are not escaped, their field values are.
+        self.escaped = self.transforms
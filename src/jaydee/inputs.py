@@ -0,0 +1,120 @@
+import codecs
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+# Documents accepted by the scraper. Strings are always markup, paths must be path objects.
+DocumentSource = str | bytes | bytearray | memoryview | os.PathLike | BinaryIO
+
+# Byte order marks, longest first so UTF-32 isn't taken for UTF-16.
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF32_LE, "utf-32le"),
+    (codecs.BOM_UTF32_BE, "utf-32be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16le"),
+    (codecs.BOM_UTF16_BE, "utf-16be"),
+)
+
+# Like browsers, only the start of the document is searched for a charset declaration.
+PRESCAN_BYTES = 1024
+
+META_CHARSET = re.compile(
+    rb"<meta[^>]+charset\s*=\s*[\"']?\s*([a-zA-Z0-9_:.+-]+)", re.IGNORECASE
+)
+
+
+def sniff_encoding(data) -> str | None:
+    """
+    Detects the encoding of a binary document from its byte order mark or `<meta charset>`.
+
+    Args:
+        data: the document or its beginning, any object supporting the buffer protocol.
+    Returns:
+        the name of the encoding, None if the document doesn't declare a known encoding.
+    """
+    head = bytes(data[:PRESCAN_BYTES])
+
+    for mark, encoding in BYTE_ORDER_MARKS:
+        if head.startswith(mark):
+            return encoding
+
+    match = META_CHARSET.search(head)
+    if match is None:
+        return None
+
+    try:
+        encoding = codecs.lookup(match[1].decode("ascii")).name
+    except LookupError:
+        return None
+
+    # A document that could be read as ASCII to find the declaration isn't UTF-16.
+    if encoding.startswith("utf-16"):
+        return "utf-8"
+
+    return encoding
+
+
+def read_source(source: DocumentSource) -> str | bytes | memoryview | os.PathLike:
+    """
+    Reads file objects, which can only be read once, so the document can be parsed again.
+
+    Other sources are returned as is, paths are only read when the document is parsed.
+    """
+    if hasattr(source, "read"):
+        return source.read()
+
+    return source
+
+
+def source_size(source) -> int:
+    """Returns the length of a read source, the file size for paths."""
+    if isinstance(source, os.PathLike):
+        return os.path.getsize(source)
+
+    if isinstance(source, memoryview):
+        return source.nbytes
+
+    return len(source)
+
+
+@contextmanager
+def open_source(
+    source,
+) -> Iterator[tuple[str | bytes | memoryview | mmap.mmap, str | None]]:
+    """
+    Opens a read source for parsing.
+
+    Paths are memory-mapped, so hashing and sniffing the document reads straight from the
+    page cache. The map is closed when the context exits.
+
+    Args:
+        source: a document returned by `read_source`.
+    Yields:
+        the document markup and the detected encoding, None for strings.
+    """
+    if isinstance(source, str):
+        yield source, None
+        return
+
+    if not isinstance(source, os.PathLike):
+        yield source, sniff_encoding(source)
+        return
+
+    with open(source, "rb") as file:
+        # Empty files can't be mapped.
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b"", None
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped, sniff_encoding(mapped)
+
+
+def as_markup(markup) -> str | bytes:
+    """Converts a buffer to the bytes BeautifulSoup expects, strings and bytes are kept as is."""
+    if isinstance(markup, (str, bytes)):
+        return markup
+
+    return bytes(markup)
@@ -1,4 +1,5 @@
 from .waitfor import WaitForOptions  # noqa
+from .requestfilter import RequestFilterOptions  # noqa
 from .scraper import ScraperOptions  # noqa
 from .multithread import MultithreadOptions  # noqa
 from .crawlers import LinkCrawlerOptions, GitCrawlerOptions  # noqa
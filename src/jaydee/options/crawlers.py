@@ -1,6 +1,11 @@
 from dataclasses import dataclass
 
-from . import ScraperOptions, WaitForOptions, MultithreadOptions
+from . import (
+    ScraperOptions,
+    WaitForOptions,
+    MultithreadOptions,
+    RequestFilterOptions,
+)
 
 
 @dataclass(init=False)
@@ -24,6 +29,9 @@ class LinkCrawlerOptions:
     # Options related to waiting for certain events before scraping.
     _wait_for_options: WaitForOptions
 
+    # Options for aborting the requests of pages that crawling doesn't need.
+    _request_filter_options: RequestFilterOptions
+
     # Options for the base scraper
     _scraper_options: ScraperOptions
 
@@ -44,6 +52,7 @@ class LinkCrawlerOptions:
         strict=True,
         multithreaded=False,
         multithread_options=MultithreadOptions(),
+        request_filter_options=RequestFilterOptions(),
     ):
         """Setup default values."""
         self._headless = headless
@@ -52,3 +61,4 @@ class LinkCrawlerOptions:
         self._strict = strict
         self._multithreaded = multithreaded
         self._multithread_options = multithread_options
+        self._request_filter_options = request_filter_options
@@ -6,13 +6,33 @@ class MultithreadOptions:
     # The amount of contexts that are within the pool at any given time.
     _pool_size: int
 
-    # Max amount of tasks that can be run concurrently.
+    # Max amount of tasks that can be run concurrently, the amount of workers each
+    # browser instance of a webscraper has.
     _max_concurrent_tasks: int
 
+    # The amount of browser processes the contexts of the pool share, one process for
+    # each context when None. Fewer processes use less memory and start faster, at the
+    # cost of isolation: a crashing browser takes all of its contexts with it.
+    _browser_processes: int | None
+
+    # When set, each browser context keeps a pool of open pages that are reset and
+    # reused between pages, a page is replaced after being used this many times.
+    _page_reuse_limit: int | None
+
     def __init__(
         self,
         pool_size: int = 2,
         max_concurrent_tasks: int = 4,
+        browser_processes: int | None = None,
+        page_reuse_limit: int | None = None,
     ):
+        if browser_processes is not None and browser_processes < 1:
+            raise ValueError("browser_processes must be at least 1.")
+
+        if page_reuse_limit is not None and page_reuse_limit < 1:
+            raise ValueError("page_reuse_limit must be at least 1.")
+
         self._pool_size = pool_size
         self._max_concurrent_tasks = max_concurrent_tasks
+        self._browser_processes = browser_processes
+        self._page_reuse_limit = page_reuse_limit
@@ -0,0 +1,119 @@
+import re
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Route
+
+from ..stats import RequestStats
+
+# Resource types that don't affect the HTML the rules are evaluated against.
+STATIC_RESOURCE_TYPES = frozenset(["image", "font", "media", "stylesheet"])
+
+
+@dataclass(init=False)
+class RequestFilterOptions:
+    """
+    Options for aborting the requests of a page that the scraping doesn't need.
+
+    Requests are aborted by their Playwright resource type, such as image, font, media
+    or stylesheet, by a regular expression searched for in their URL, or by the domain
+    they are sent to. The document requests of the pages themselves are never aborted.
+    """
+
+    # Resource types of the requests that are aborted.
+    _resource_types: frozenset[str]
+
+    # Requests with a URL matching any of the patterns are aborted.
+    _url_patterns: tuple[re.Pattern, ...]
+
+    # Requests to the domains or their subdomains are aborted.
+    _blocked_domains: frozenset[str]
+
+    def __init__(
+        self,
+        resource_types=(),
+        url_patterns=(),
+        blocked_domains=(),
+    ):
+        self._resource_types = frozenset(resource_types)
+        self._blocked_domains = frozenset(
+            domain.lower().lstrip(".") for domain in blocked_domains
+        )
+
+        try:
+            self._url_patterns = tuple(re.compile(pattern) for pattern in url_patterns)
+        except re.error as e:
+            raise ValueError(f"Invalid URL pattern: {e}") from e
+
+    @classmethod
+    def static(cls, url_patterns=(), blocked_domains=()) -> "RequestFilterOptions":
+        """
+        Options that abort the images, fonts, media and stylesheets of the pages.
+
+        These resources don't change the HTML the rules are evaluated against, unlike
+        scripts, which are let through.
+
+        Args:
+            url_patterns: optional regular expressions of URLs that are also aborted.
+            blocked_domains: optional domains whose requests are also aborted.
+        """
+        return cls(STATIC_RESOURCE_TYPES, url_patterns, blocked_domains)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._resource_types or self._url_patterns or self._blocked_domains)
+
+    def blocks(self, url: str, resource_type: str) -> bool:
+        """
+        Checks whether a request is aborted.
+
+        Args:
+            url: the URL of the request.
+            resource_type: the Playwright resource type of the request.
+        Returns:
+            True when the request is aborted.
+        """
+        if resource_type == "document":
+            return False
+
+        if resource_type in self._resource_types:
+            return True
+
+        if self._blocked_domains:
+            host = (urlsplit(url).hostname or "").lower()
+
+            # Checks the host and each of its parent domains.
+            while host:
+                if host in self._blocked_domains:
+                    return True
+
+                _, _, host = host.partition(".")
+
+        return any(pattern.search(url) for pattern in self._url_patterns)
+
+    async def async_install(self, context: BrowserContext, stats: RequestStats):
+        """
+        Installs a route handler on a browser context that aborts the filtered requests.
+
+        Nothing is installed when no filters are set, since routing every request of the
+        context through the handler has a cost of its own.
+
+        Args:
+            context: the browser context, the handler applies to all of its pages.
+            stats: the counters of the blocked and allowed requests.
+        """
+        if not self.enabled:
+            return
+
+        async def handle(route: Route):
+            request = route.request
+
+            if self.blocks(request.url, request.resource_type):
+                stats.add_blocked(request.resource_type)
+                await route.abort("blockedbyclient")
+                return
+
+            stats.allowed += 1
+            await route.continue_()
+
+        await context.route("**/*", handle)
@@ -1,5 +1,10 @@
 from dataclasses import dataclass
 
+from ..cache import ParseCache, ResultCache, RuleSetCache
+
+# The default parser to use for scraping data.
+DEFAULT_PARSER = "html5lib"
+
 
 @dataclass(init=False)
 class ScraperOptions:
@@ -9,10 +14,45 @@ class ScraperOptions:
     # Replaces apostrophes and quotes with escape string syntax
     _add_escapes: bool
 
+    # The tree builder BeautifulSoup parses documents with, e.g. html5lib, lxml or html.parser.
+    _parser: str
+
+    # Evaluates all rules with a single walk over the document instead of one per rule.
+    _single_pass: bool
+
+    # Parses only the subtrees the rules can reach, only supported by lxml.
+    _restrict_parse: bool
+
+    # Optional cache of parsed documents, can be shared between scrapers.
+    _parse_cache: ParseCache | None
+
+    # Collects timing and match counts of each rule, available from the scrapers stats.
+    _profile: bool
+
+    # Optional persistent cache of the rule sets loaded from JSON files.
+    _rule_cache: RuleSetCache | None
+
+    # Optional persistent cache of scrape results, unchanged documents are not parsed again.
+    _result_cache: ResultCache | None
+
     def __init__(
         self,
         allow_unknown_tags: bool = False,
         add_escapes: bool = False,
+        parser: str = DEFAULT_PARSER,
+        single_pass: bool = False,
+        restrict_parse: bool = False,
+        parse_cache: ParseCache | None = None,
+        profile: bool = False,
+        rule_cache: RuleSetCache | None = None,
+        result_cache: ResultCache | None = None,
     ):
         self._allow_unknown_tags = allow_unknown_tags
         self._add_escapes = add_escapes
+        self._parser = parser
+        self._single_pass = single_pass
+        self._restrict_parse = restrict_parse
+        self._parse_cache = parse_cache
+        self._profile = profile
+        self._rule_cache = rule_cache
+        self._result_cache = result_cache
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from . import WaitForOptions, MultithreadOptions
+from . import WaitForOptions, MultithreadOptions, RequestFilterOptions
 
 
 @dataclass(init=False)
@@ -17,14 +17,19 @@ class WebScraperOptions:
     # Options related to waiting for certain events before scraping.
     _wait_for_options: WaitForOptions
 
+    # Options for aborting the requests of pages that scraping doesn't need.
+    _request_filter_options: RequestFilterOptions
+
     def __init__(
         self,
         timeout: int = 5,
         retries: int = 3,
         wait_for_options=WaitForOptions(),
         multithread_options=MultithreadOptions(),
+        request_filter_options=RequestFilterOptions(),
     ):
         self._timeout = timeout
         self._retries = retries
         self._wait_for_options = wait_for_options
         self._multithread_options = multithread_options
+        self._request_filter_options = request_filter_options
@@ -0,0 +1,258 @@
+from dataclasses import dataclass
+from typing import Iterator
+
+import soupsieve
+from bs4 import Tag
+
+from .stats import RuleStats
+from .transforms import ESCAPE, Pipeline
+
+
+@dataclass(frozen=True)
+class MatchStep:
+    """
+    A single level of a scraper rule compiled into a tag predicate.
+
+    The predicate mirrors the way BeautifulSoup matches `find_all(element, attrs={...})`:
+    ids and class names separated by whitespace are alternatives, a tag matches when
+    any of them match.
+
+    Args:
+        element: the name of the tag to match, None matches any tag.
+        ids: the accepted ids, None if the id is not part of the match.
+        class_names: the accepted class names, None if the class is not part of the match.
+    """
+
+    element: str | None = None
+    ids: frozenset[str] | None = None
+    class_names: frozenset[str] | None = None
+
+    @classmethod
+    def from_attributes(cls, attributes) -> "MatchStep":
+        """Compiles a step from a rules attributes or one of its child_of levels."""
+        id = attributes.get("id")
+        class_name = attributes.get("class_name")
+
+        return cls(
+            element=attributes.get("element"),
+            ids=frozenset(id.split(" ")) if id else None,
+            class_names=frozenset(class_name.split(" ")) if class_name else None,
+        )
+
+    def matches(self, tag: Tag) -> bool:
+        """Returns whether or not the given tag satisfies this step."""
+        if self.element is not None and tag.name != self.element:
+            return False
+
+        if self.ids is not None and tag.get("id") not in self.ids:
+            return False
+
+        if self.class_names is not None:
+            classes = tag.get("class")
+            if classes is None:
+                return False
+
+            if isinstance(classes, str):
+                return classes in self.class_names
+
+            # Like BeautifulSoup, match single class names and the full class string.
+            for name in classes:
+                if name in self.class_names:
+                    return True
+
+            return " ".join(classes) in self.class_names
+
+        return True
+
+
+class StartTag:
+    """The name and attributes of a tag that is being parsed, matched like a BeautifulSoup tag."""
+
+    __slots__ = ("name", "attrs")
+
+    def __init__(self, name: str, attrs: dict[str, str | list[str]]):
+        self.name = name
+        self.attrs = attrs
+
+    def get(self, key: str, default=None):
+        return self.attrs.get(key, default)
+
+
+class RulePlan:
+    """
+    An execution plan for a single scraper rule.
+
+    Rules are compiled once when they are added to a scraper. The steps of the flattened
+    `child_of` chain, outermost ancestor first, are evaluated against the live tree: every
+    step searches only within the elements matched by the previous one.
+    CSS selectors are compiled once and reused for every document.
+
+    Args:
+        rule: the scraper rule to compile.
+    Raises:
+        SelectorSyntaxError: when the CSS selector of the rule is invalid.
+    """
+
+    def __init__(self, rule):
+        self.target = rule.target
+        self.select = rule.select
+        self.property = rule.property
+
+        self.selector = None
+        if self.select is not None:
+            self.selector = soupsieve.compile(self.select)
+
+        # The transforms of the rule, and with escapes for the add_escapes option.
+        self.transforms = rule.pipeline
+        self.escaped = self.transforms
+        if self.select is None and not self.property:
+            self.escaped = self.transforms.then(ESCAPE)
+
+        # Steps that narrow down the search scope and the final step matching the data.
+        self.scope_steps = rule.scope_steps
+        self.step = rule.step
+
+    def resolve_scope(
+        self,
+        root: Tag,
+        stats: RuleStats | None = None,
+        memo: dict[tuple[MatchStep, ...], list[Tag]] | None = None,
+    ) -> list[Tag]:
+        """
+        Resolves the `child_of` chain of the rule.
+
+        Rules often share the outer levels of their chains. When a memo is given, the scope
+        of every prefix of the chain is stored in it, and the longest prefix that is already
+        resolved is reused, so a prefix is only resolved once per document.
+
+        Args:
+            root: the root of the parsed document.
+            stats: optional statistics to count the visited elements into.
+            memo: optional scopes of the resolved chain prefixes of the same document.
+        Returns:
+            list of elements within which the rule is matched, empty if a level matched nothing.
+        """
+        scope = [root]
+        start = 0
+
+        if memo is not None:
+            for end in range(len(self.scope_steps), 0, -1):
+                cached = memo.get(self.scope_steps[:end])
+                if cached is not None:
+                    scope, start = cached, end
+                    break
+
+        for end in range(start + 1, len(self.scope_steps) + 1):
+            if not scope:
+                break
+
+            scope = outermost(find_matches(scope, self.scope_steps[end - 1], stats))
+
+            if memo is not None:
+                memo[self.scope_steps[:end]] = scope
+
+        return scope
+
+    def pipeline(self, add_escapes: bool) -> Pipeline:
+        """
+        Returns the transforms applied to the values of the rule.
+
+        Like before transforms were introduced, the add_escapes option only escapes the
+        text of rules matched by their attributes, after the transforms of the rule.
+        """
+        return self.escaped if add_escapes else self.transforms
+
+    def match(self, root: Tag) -> list[Tag]:
+        """
+        Finds all elements matching the rule in document order.
+
+        Args:
+            root: the root of the parsed document.
+        Returns:
+            list of matched elements.
+        """
+        if self.selector is not None:
+            return self.selector.select(root)
+
+        return find_matches(self.resolve_scope(root), self.step)
+
+    def iter_match(
+        self, root: Tag, memo: dict[tuple[MatchStep, ...], list[Tag]] | None = None
+    ) -> Iterator[Tag]:
+        """
+        Lazily finds the elements matching the rule in document order.
+
+        Only the `child_of` scope is resolved up front, the matching elements are found
+        as the iterator is consumed.
+
+        Args:
+            root: the root of the parsed document.
+            memo: optional scopes of the resolved chain prefixes, see `resolve_scope`.
+        Returns:
+            iterator of matched elements.
+        """
+        if self.selector is not None:
+            return self.selector.iselect(root)
+
+        return iter_matches(self.resolve_scope(root, memo=memo), self.step)
+
+
+def find_matches(
+    scope: list[Tag], step: MatchStep, stats: RuleStats | None = None
+) -> list[Tag]:
+    """
+    Collects descendants of the scope elements that satisfy the given step.
+
+    The scope elements are expected to be disjoint subtrees in document order,
+    which keeps the result in document order without duplicates.
+    """
+    matches = step.matches
+    found = []
+
+    if stats is None:
+        for root in scope:
+            for node in root.descendants:
+                if isinstance(node, Tag) and matches(node):
+                    found.append(node)
+
+        return found
+
+    visited = 0
+    for root in scope:
+        for node in root.descendants:
+            if isinstance(node, Tag):
+                visited += 1
+                if matches(node):
+                    found.append(node)
+
+    stats.traversals += len(scope)
+    stats.nodes_visited += visited
+    return found
+
+
+def iter_matches(scope: list[Tag], step: MatchStep) -> Iterator[Tag]:
+    """Lazily yields the descendants of the scope elements that satisfy the given step."""
+    matches = step.matches
+
+    for root in scope:
+        for node in root.descendants:
+            if isinstance(node, Tag) and matches(node):
+                yield node
+
+
+def outermost(tags: list[Tag]) -> list[Tag]:
+    """
+    Drops the tags that are nested within another tag of the list.
+
+    Searching within the outermost tags covers the nested ones, so they would
+    only produce duplicate matches.
+    """
+    kept = []
+
+    for tag in tags:
+        if kept and any(parent is kept[-1] for parent in tag.parents):
+            continue
+
+        kept.append(tag)
+
+    return kept
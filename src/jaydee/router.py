@@ -0,0 +1,105 @@
+import logging
+import re
+
+from .scraper import Scraper
+
+logger = logging.getLogger("jd-router")
+
+
+class _PrefixNode:
+    """A node of the URL prefix trie."""
+
+    __slots__ = ("children", "scraper")
+
+    def __init__(self):
+        self.children = {}
+        self.scraper = None
+
+
+class ScraperRouter:
+    """
+    ScraperRouter routes pages to the scraper whose rule set applies to their URL.
+
+    Routes are URL prefixes, kept in a trie, and regular expressions. A URL is routed to
+    the scraper of the longest prefix it starts with. URLs that start with no prefix are
+    matched against the patterns in the order they were added, and fall back to the
+    default scraper. Pages with no route are not scraped.
+
+    Args:
+        default: an optional scraper for URLs that match no route.
+    """
+
+    def __init__(self, default: Scraper | None = None):
+        self.default = default
+
+        self._root = _PrefixNode()
+        self._patterns = []
+
+    def add_prefix(self, prefix: str, scraper: Scraper):
+        """
+        Routes URLs starting with the prefix to the scraper.
+
+        Args:
+            prefix: the start of the URLs, e.g. https://example.com/products/
+            scraper: the scraper for the pages.
+        Returns:
+            The instance of self with the added route.
+        """
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _PrefixNode())
+
+        if node.scraper is not None:
+            logger.warning(f"Replacing the scraper of the route: {prefix}")
+
+        node.scraper = scraper
+        return self
+
+    def add_pattern(self, pattern: str | re.Pattern, scraper: Scraper):
+        """
+        Routes URLs matching the regular expression to the scraper.
+
+        Args:
+            pattern: a regular expression that is searched for in the URLs.
+            scraper: the scraper for the pages.
+        Returns:
+            The instance of self with the added route.
+        Raises:
+            ValueError: when the pattern is not a valid regular expression.
+        """
+        try:
+            compiled = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid URL pattern: {pattern}, {e}") from e
+
+        self._patterns.append((compiled, scraper))
+        return self
+
+    def route(self, url: str) -> Scraper | None:
+        """
+        Finds the scraper for a URL.
+
+        Args:
+            url: the URL of the page.
+        Returns:
+            The scraper of the matching route, None if the page should not be scraped.
+        """
+        scraper = None
+
+        node = self._root
+        for char in url:
+            node = node.children.get(char)
+            if node is None:
+                break
+
+            if node.scraper is not None:
+                scraper = node.scraper
+
+        if scraper is not None:
+            return scraper
+
+        for pattern, scraper in self._patterns:
+            if pattern.search(url):
+                return scraper
+
+        return self.default
@@ -1,100 +1,118 @@
 import json
 import logging
 import os
+import time
+from itertools import islice
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Iterator
 
 from .options import ScraperOptions
+from .options.scraper import DEFAULT_PARSER  # noqa
+from .plan import MatchStep, RulePlan, find_matches
+from .engine import RecordPlan, TraversalEngine
+from .stream import StreamMatcher, iter_chunks
+from .strainer import RESTRICTABLE_PARSERS, build_strainer, subtree_roots
+from .cache import document_hash, rule_set_hash
+from .document import Document
+from .inputs import DocumentSource, as_markup, open_source, read_source, source_size
+from .stats import RuleStats, ScrapeStats
+from .transforms import Pipeline, compile_transforms
 
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from soupsieve import SelectorSyntaxError
 
 # Setup the scraper specific logger
 logger = logging.getLogger("jd-scraper")
 
-# The default parser to use for scraping data.
-DEFAULT_PARSER = "html5lib"
-
 # Valid HTML elements. Used for validating rules.
-VALID_ELEMENTS = [
-    "a",
-    "abbr",
-    "acronym",
-    "address",
-    "area",
-    "article",
-    "b",
-    "base",
-    "bdo",
-    "big",
-    "blockquote",
-    "body",
-    "br",
-    "button",
-    "caption",
-    "cite",
-    "code",
-    "col",
-    "colgroup",
-    "dd",
-    "del",
-    "dfn",
-    "div",
-    "dl",
-    "DOCTYPE",
-    "dt",
-    "em",
-    "fieldset",
-    "form",
-    "h1",
-    "h2",
-    "h3",
-    "h4",
-    "h5",
-    "h6",
-    "head",
-    "html",
-    "hr",
-    "i",
-    "img",
-    "input",
-    "ins",
-    "kbd",
-    "label",
-    "legend",
-    "li",
-    "link",
-    "map",
-    "main",
-    "meta",
-    "noscript",
-    "object",
-    "ol",
-    "optgroup",
-    "option",
-    "p",
-    "param",
-    "pre",
-    "q",
-    "samp",
-    "script",
-    "select",
-    "small",
-    "span",
-    "strong",
-    "style",
-    "sub",
-    "sup",
-    "table",
-    "tbody",
-    "td",
-    "textarea",
-    "tfoot",
-    "th",
-    "thead",
-    "title",
-    "tr",
-    "tt",
-    "ul",
-    "var",
-]
+VALID_ELEMENTS = frozenset(
+    [
+        "a",
+        "abbr",
+        "acronym",
+        "address",
+        "area",
+        "article",
+        "b",
+        "base",
+        "bdo",
+        "big",
+        "blockquote",
+        "body",
+        "br",
+        "button",
+        "caption",
+        "cite",
+        "code",
+        "col",
+        "colgroup",
+        "dd",
+        "del",
+        "dfn",
+        "div",
+        "dl",
+        "DOCTYPE",
+        "dt",
+        "em",
+        "fieldset",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "head",
+        "html",
+        "hr",
+        "i",
+        "img",
+        "input",
+        "ins",
+        "kbd",
+        "label",
+        "legend",
+        "li",
+        "link",
+        "map",
+        "main",
+        "meta",
+        "noscript",
+        "object",
+        "ol",
+        "optgroup",
+        "option",
+        "p",
+        "param",
+        "pre",
+        "q",
+        "samp",
+        "script",
+        "select",
+        "small",
+        "span",
+        "strong",
+        "style",
+        "sub",
+        "sup",
+        "table",
+        "tbody",
+        "td",
+        "textarea",
+        "tfoot",
+        "th",
+        "thead",
+        "title",
+        "tr",
+        "tt",
+        "ul",
+        "var",
+    ]
+)
 
 
 class ScraperRule:
@@ -107,19 +125,36 @@ class ScraperRule:
     elements with given class names or ids from the HTML document and stores them into
     the resulting objects target keys.
 
+    Rules are immutable. The steps matching the element and its `child_of` ancestors are
+    computed once when the rule is constructed.
+
     Args:
         target: the key that will store the resulting elements text after scraping.
                 Do note that this is an unique identifier, two rules with the same target can not be used.
         attributes: an object that contains the scraping attributes such as element, id and class name.
+        transforms: optional list of transforms applied to the scraped values in order, see
+                    `compile_transforms` for the available transforms.
     Raises:
         ValueException when validation of the rule fails.
     """
 
+    __slots__ = (
+        "_target",
+        "_select",
+        "_attribs",
+        "_step",
+        "_scope_steps",
+        "_transforms",
+        "_pipeline",
+        "_hash",
+    )
+
     def __init__(
         self,
         target: str,
         select: str | None = None,
         attributes: dict[str, str | dict] | None = None,
+        transforms: list[str | dict] | None = None,
     ):
         """Constructor"""
         # First validate the rule.
@@ -129,10 +164,9 @@ class ScraperRule:
         if not target or target == "":
             raise ValueError("Target can not be an empty string.")
 
-        self._target = target
-        self._select = select
+        pipeline = compile_transforms(transforms)
 
-        self._attribs = {
+        attribs = {
             "id": None,
             "element": None,
             "class_name": None,
@@ -141,7 +175,25 @@ class ScraperRule:
         }
 
         if attributes is not None:
-            self._attribs.update(attributes)
+            attribs.update(attributes)
+
+        chain = []
+        curr = attribs["child_of"]
+        while curr:
+            chain.append(MatchStep.from_attributes(curr))
+            curr = curr.get("child_of")
+
+        chain.reverse()
+
+        assign = object.__setattr__
+        assign(self, "_target", target)
+        assign(self, "_select", select)
+        assign(self, "_attribs", _freeze(attribs))
+        assign(self, "_step", MatchStep.from_attributes(attribs))
+        assign(self, "_scope_steps", tuple(chain))
+        assign(self, "_transforms", _freeze(list(transforms or ())))
+        assign(self, "_pipeline", pipeline)
+        assign(self, "_hash", hash(self._identity()))
 
     def __getitem__(self, key: str):
         """
@@ -184,12 +236,109 @@ class ScraperRule:
 
     @property
     def attributes(self):
+        """Read-only view of the attributes, use `to_dict` for a mutable copy."""
         return self._attribs
 
     @property
     def target(self):
         return self._target
 
+    @property
+    def select(self) -> str | None:
+        return self._select
+
+    @property
+    def step(self) -> MatchStep:
+        """The step matching the scraped elements."""
+        return self._step
+
+    @property
+    def scope_steps(self) -> tuple[MatchStep, ...]:
+        """The steps matching the `child_of` ancestors, outermost ancestor first."""
+        return self._scope_steps
+
+    @property
+    def transforms(self) -> tuple:
+        return self._transforms
+
+    @property
+    def pipeline(self) -> Pipeline:
+        """The compiled transforms of the rule."""
+        return self._pipeline
+
+    @property
+    def property(self) -> str | None:
+        return self._attribs["property"]
+
+    def to_dict(self) -> dict:
+        """Returns the rule as a dictionary of the constructor arguments."""
+        data = {
+            "target": self._target,
+            "select": self._select,
+            "attributes": _thaw(self._attribs),
+        }
+
+        if self._transforms:
+            data["transforms"] = _thaw(self._transforms)
+
+        return data
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Scraper rules are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Scraper rules are immutable.")
+
+    def _identity(self) -> tuple:
+        """Returns the hashable values that define the rule."""
+        return (
+            self._target,
+            self._select,
+            _key(self._attribs),
+            _key(self._transforms),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, ScraperRule):
+            return NotImplemented
+
+        return (
+            type(self) is type(other)
+            and self._hash == other._hash
+            and self._identity() == other._identity()
+        )
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Restored rules are not validated again and keep their computed steps.
+        return (
+            _restore_rule,
+            (
+                type(self),
+                self._target,
+                self._select,
+                _thaw(self._attribs),
+                self._step,
+                self._scope_steps,
+                _thaw(self._transforms),
+                self._pipeline,
+            ),
+            self._state(),
+        )
+
+    def _state(self) -> dict:
+        """Returns the state of subclasses that is restored after the base rule."""
+        return {}
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+        # String hashes differ between processes, so the hash is computed again.
+        object.__setattr__(self, "_hash", hash(self._identity()))
+
     def __str__(self):
         return "\n".join(
             [
@@ -197,12 +346,151 @@ class ScraperRule:
                 f" - looks for element: {self._attribs['element']}",
                 f" - with class name: {self._attribs['class_name']}",
                 f" - with id: {self._attribs['id']}",
-                f" - with child rules: {self._attribs['child_of']}",
+                f" - with child rules: {_thaw(self._attribs['child_of'])}",
                 f" - or with select: {self._select}",
             ]
         )
 
 
+class RecordRule(ScraperRule):
+    """
+    A record rule scrapes repeated structures, such as product cards, into records.
+
+    The attributes or the CSS selector of the rule match the containers of the records.
+    Every container becomes a record that maps the targets of the field rules to the
+    value of their first match within the container, or None when a field has no match.
+    The fields of a container are evaluated with a single walk over the container.
+
+    Args:
+        target: the key that will store the records after scraping.
+        fields: the rules of the fields, matched within each container. Rules can also
+                be given as dictionaries of their constructor arguments.
+        select: optional CSS selector matching the containers.
+        attributes: the scraping attributes matching the containers.
+        transforms: not supported, records aren't text. Add the transforms to the fields,
+                    they are applied to the values of each field.
+    Raises:
+        ValueException when validation of the rule or its fields fails, or when the
+        record rule is given transforms.
+    """
+
+    __slots__ = ("_fields",)
+
+    def __init__(
+        self,
+        target: str,
+        fields: list[ScraperRule | dict],
+        select: str | None = None,
+        attributes: dict[str, str | dict] | None = None,
+        transforms: list[str | dict] | None = None,
+    ):
+        """Constructor"""
+        if transforms:
+            raise ValueError(
+                f"Record rule: {target} can't have transforms, add them to its fields instead."
+            )
+
+        fields = tuple(
+            field if isinstance(field, ScraperRule) else ScraperRule(**field)
+            for field in fields
+        )
+
+        if len(fields) == 0:
+            raise ValueError("Record rules must have at least one field.")
+
+        targets = set()
+        for field in fields:
+            if isinstance(field, RecordRule):
+                raise ValueError(
+                    f"Record field: {field.target} can't be a record rule."
+                )
+
+            if field.target in targets:
+                raise ValueError(f"Duplicate record field: {field.target}")
+
+            targets.add(field.target)
+
+        if select is None and attributes is None:
+            raise ValueError(
+                "Record rules need attributes or a selector for the containers."
+            )
+
+        # The fields are part of the hash computed by the base constructor.
+        object.__setattr__(self, "_fields", fields)
+        super().__init__(target, select, attributes)
+
+    @property
+    def fields(self) -> tuple[ScraperRule, ...]:
+        return self._fields
+
+    def to_dict(self) -> dict:
+        """Returns the rule as a dictionary of the constructor arguments."""
+        data = super().to_dict()
+        data["fields"] = [field.to_dict() for field in self._fields]
+        return data
+
+    def _identity(self) -> tuple:
+        return super()._identity() + (self._fields,)
+
+    def _state(self) -> dict:
+        return {"_fields": self._fields}
+
+    def __str__(self):
+        fields = ", ".join(field.target for field in self._fields)
+        return f"{super().__str__()}\n - with fields: {fields}"
+
+
+def _restore_rule(
+    cls, target, select, attributes, step, scope_steps, transforms, pipeline
+) -> ScraperRule:
+    """Recreates a pickled rule without validating it again."""
+    rule = object.__new__(cls)
+
+    assign = object.__setattr__
+    assign(rule, "_target", target)
+    assign(rule, "_select", select)
+    assign(rule, "_attribs", _freeze(attributes))
+    assign(rule, "_step", step)
+    assign(rule, "_scope_steps", scope_steps)
+    assign(rule, "_transforms", _freeze(transforms))
+    assign(rule, "_pipeline", pipeline)
+
+    return rule
+
+
+def _freeze(attributes):
+    """Wraps attributes and their `child_of` levels into read-only views, lists into tuples."""
+    if isinstance(attributes, list):
+        return tuple(_freeze(v) for v in attributes)
+
+    if not isinstance(attributes, dict):
+        return attributes
+
+    return MappingProxyType({k: _freeze(v) for k, v in attributes.items()})
+
+
+def _thaw(attributes):
+    """Copies read-only attributes back into dictionaries and lists."""
+    if isinstance(attributes, tuple):
+        return [_thaw(v) for v in attributes]
+
+    if not isinstance(attributes, MappingProxyType):
+        return attributes
+
+    return {k: _thaw(v) for k, v in attributes.items()}
+
+
+def _key(attributes):
+    """Returns a hashable key of attributes."""
+    if isinstance(attributes, (list, tuple)):
+        return tuple(_key(v) for v in attributes)
+
+    if not isinstance(attributes, (dict, MappingProxyType)):
+        return attributes
+
+    return tuple(sorted((k, _key(v)) for k, v in attributes.items()))
+
+
 class Scraper:
     """
     Scraper takes in the inner HTML document and a list of rules that determine
@@ -211,29 +499,47 @@ class Scraper:
     Args:
         html_doc: an optional html document to scrape data from. if left empty, the scraper
                     instance must be initialized later with an html doc before any scraping.
+                    Besides strings, bytes, memoryviews, binary files and path objects are
+                    accepted. Paths are memory-mapped when the document is parsed.
+                    A shared `Document` is scraped without parsing it again.
         rules: an optional list of scraper rules to initialize the scraper with.
         options: optionally add your own scraper options.
     """
 
     def __init__(
         self,
-        html_doc: str = None,
+        html_doc: DocumentSource | Document = None,
         rules: list[ScraperRule] = None,
         options: ScraperOptions = ScraperOptions(),
     ):
-        if html_doc is None:
-            self._document = None
-            self._parser = None
-        else:
-            self._document = html_doc
-            self._parser = BeautifulSoup(html_doc, DEFAULT_PARSER)
+        self.__validate_parser(options)
+        self._options = options
 
         self.rules = {}
-        self._options = options
+        self._plans = {}
+        self._engine = None
+
+        # The configuration and hash of the rule set used as the key of cached results.
+        self._rule_set_hash = None
+
+        # Whether the tree was parsed with a strainer and misses rules added afterwards.
+        self._restricted = False
+        self._stale = False
+
+        # Profiling data of the latest parse and scrape.
+        self._parse_time = 0.0
+        self._stats = None
 
         if rules is not None:
             self.add_rules(rules)
 
+        if html_doc is None:
+            self._document = None
+            self._parser = None
+        else:
+            self._document = read_source(html_doc)
+            self._parser = self.__parse(self._document)
+
     def add_rule(self, rule: ScraperRule):
         """
         Utility function that adds a rule to the scraper.
@@ -242,24 +548,44 @@ class Scraper:
             rules: The rules to add to the scraper
         Raises:
             ScraperException: when attempting to add a rule that has the same
-                              target as another rule already defined or when a rule is otherwise invalid.
+                              target as another rule already defined, when the CSS selector
+                              of a rule is invalid or when a rule is otherwise invalid.
         """
         logging.info(f"Adding rule with target: {rule.target}")
 
+        if rule.attributes is not None:
+            self.__validate_html_tag(rule.attributes)
+
+        if isinstance(rule, RecordRule):
+            for field in rule.fields:
+                self.__validate_html_tag(field.attributes)
+
+        try:
+            plan = RecordPlan(rule) if isinstance(rule, RecordRule) else RulePlan(rule)
+        except SelectorSyntaxError as e:
+            raise ScraperException(f"Invalid CSS selector: {e}", rule) from e
+
+        self.__add_plan(rule, plan)
+
+    def __add_plan(self, rule: ScraperRule, plan: RulePlan):
+        """Adds a validated rule together with its compiled plan."""
         if rule.target in self.rules:
             raise ScraperException(
                 "Attempting to add a rule that has an overlapping target with another rule.",
                 rule,
             )
 
-        if rule.attributes is not None:
-            self.__validate_html_tag(rule.attributes)
-
         self.rules[rule.target] = rule
+        self._plans[rule.target] = plan
+        self._engine = None
+        self._rule_set_hash = None
+
+        if self._restricted:
+            self._stale = True
 
     def __validate_html_tag(self, attributes):
         """Check for valid HTML element."""
-        if "element" in attributes:
+        if attributes.get("element") is not None:
             if (
                 attributes["element"] not in VALID_ELEMENTS
                 and not self._options._allow_unknown_tags
@@ -292,23 +618,47 @@ class Scraper:
         """
         Import rules from a JSON file or a JSON string.
 
+        Rules loaded from a file are stored in the rule cache of the scraper options when
+        it is set, and are loaded from it while the file is unchanged.
+
         Args:
             json_data: the path or the json string to import the JSON data from.
 
         Returns:
             Instance of self with rules loaded from the given JSON object.
         """
+        cache = self._options._rule_cache
+        allow_unknown_tags = self._options._allow_unknown_tags
+        content = None
+
         try:
             # check if the path exists, if not consider the string to be a valid json.
             if not os.path.exists(json_data):
                 logger.info("Path does not exists, loading rules from JSON string.")
                 rules = json.loads(json_data)
             else:
-                with open(json_data) as json_file:
-                    rules = json.load(json_file)
+                if cache is not None:
+                    compiled = cache.load(json_data, allow_unknown_tags)
+
+                    if compiled is not None:
+                        for rule, plan in compiled:
+                            self.__add_plan(rule, plan)
 
+                        return self
+
+                with open(json_data, "rb") as json_file:
+                    content = json_file.read()
+
+                rules = json.loads(content)
+
+            added = []
             for rule in rules:
-                self.add_rule(ScraperRule(**rule))
+                rule = RecordRule(**rule) if "fields" in rule else ScraperRule(**rule)
+                self.add_rule(rule)
+                added.append((rule, self._plans[rule.target]))
+
+            if cache is not None and content is not None:
+                cache.store(json_data, content, added, allow_unknown_tags)
         except ScraperException as e:
             logger.error(e)
             if e.get_error_rule() is not None:
@@ -329,9 +679,6 @@ class Scraper:
             overwrite: whether or not to overwrite when the path has a pre-existing file.
         """
 
-        def convert(value):
-            return value.replace("_", "") if value != "_attribs" else "attributes"
-
         if len(self.rules) == 0:
             logger.warning("Can't convert an empty list of rules into a json file.")
             return
@@ -342,11 +689,7 @@ class Scraper:
             )
             return
 
-        rules_data = []
-        for rule in self.rules.values():
-            dict = rule.__dict__
-            keymap = {k: convert(k) for k in dict.keys()}
-            rules_data.append({nk: dict[ok] for (ok, nk) in keymap.items()})
+        rules_data = [rule.to_dict() for rule in self.rules.values()]
 
         try:
             with open(json_path, "w") as file:
@@ -356,124 +699,414 @@ class Scraper:
             logger.error("Error when converting scraper rules to a json file.")
             logger.error(e)
 
-    def scrape(self, document: str = None) -> dict:
+    def scrape(self, document: DocumentSource | Document = None) -> dict:
         """
         Scrapes the given HTML document with the provided rule set.
 
         Args:
-            document: optionally supply document that then override the current document.
+            document: optionally supply document that then override the current document,
+                      see the `html_doc` argument of the scraper for the accepted types.
 
         Returns:
             Dictionary with keys (rules targets) that map to the extracted properties or text.
         """
+        cache = self._options._result_cache
+        key = None
 
-        def build_attribs(attribs: dict[str, str | dict]) -> dict[str, str]:
-            """
-            Helper method that converts ScraperRules attributes to a BeautifulSoup
-            compatible one.
-            """
-            attrs = {}
+        if cache is not None:
+            key = self.__result_key(document)
+            document = None
 
-            # If id or class is empty, look for elements that don't have them set.
-            if "id" in attribs and attribs["id"]:
-                if attribs["id"] != "":
-                    attrs["id"] = attribs["id"].split(" ")
-                else:
-                    attrs["id"] = None
+            if key is not None:
+                result = cache.get(*key)
+                if result is not None:
+                    return result
 
-            if "class_name" in attribs and attribs["class_name"]:
-                if attribs["class_name"] != "":
-                    attrs["class"] = attribs["class_name"].split(" ")
-                else:
-                    attrs["class"] = None
+        result = {}
 
-            return attrs
+        if not self.__prepare(document):
+            return result
 
-        if document is not None:
-            self.document = document
+        stats = None
+        if self._options._profile:
+            stats = ScrapeStats(parse_time=self._parse_time)
+            scrape_start = time.perf_counter()
 
-        result = {}
+        # Evaluate all rules with one walk over the document when single pass is set.
+        matches = None
+        if self._options._single_pass:
+            if self._engine is None:
+                self._engine = TraversalEngine(list(self._plans.values()))
 
-        if len(self.rules) == 0:
-            logger.error("Can't scrape a document with 0 rules set.")
-            return result
+            matches = self._engine.run(self._parser, stats)
 
-        if len(self._document) == 0:
-            logger.error("Can't scrape an empty document.")
-            return result
+            if stats is not None:
+                stats.engine_time = time.perf_counter() - scrape_start
+
+        # Scopes of the child_of chain prefixes, shared by rules with common ancestors.
+        scopes = {}
 
         for target, rule in self.rules.items():
-            result[target] = []
-
-            if rule._select is not None:
-                result[target] = [
-                    tag.get_text() for tag in self._parser.select(rule._select)
-                ]
-                continue
-
-            curr = rule["child_of"]
-            child_rules = []
-
-            while curr:
-                child_rules.append(curr)
-
-                if "child_of" in curr:
-                    curr = curr["child_of"]
-                else:
-                    curr = None
-
-            curr_target = self._parser
-            while child_rules:
-                child_rule = child_rules.pop()
-
-                # found no child elements, improper rule
-                if not curr_target:
-                    logger.warning(
-                        f"No data loaded for rule: {rule} in child rule: {child_rule}"
-                    )
-                    break
-
-                attrs = build_attribs(child_rule)
-                if "element" in child_rule:
-                    curr_target = curr_target.find_all(
-                        child_rule["element"], attrs=attrs
-                    )
-                else:
-                    curr_target = curr_target.find_all(attrs=attrs)
-
-                curr_target = BeautifulSoup(str(curr_target), DEFAULT_PARSER)
-
-            if not curr_target:
+            plan = self._plans[target]
+
+            rule_stats = None
+            if stats is not None:
+                rule_stats = stats.add_rule(target)
+                start = time.perf_counter()
+
+            if matches is not None:
+                data = matches[target]
+            else:
+                data = self.__match(plan, rule_stats, scopes)
+
+            if data is None:
                 logger.warning(
                     f"After processing child rules, no data was found for: {rule}"
                 )
-                continue
+                data = []
+            elif len(data) == 0 and plan.select is None:
+                logger.warning(f"No data loaded for rule: {rule}")
+
+            if rule_stats is not None:
+                extract_start = time.perf_counter()
+
+            result[target] = self.__extract(plan, data)
+
+            if rule_stats is not None:
+                end = time.perf_counter()
+                rule_stats.matched = len(data)
+                rule_stats.extract_time = end - extract_start
+                rule_stats.wall_time = end - start
+
+        if stats is not None:
+            stats.scrape_time = time.perf_counter() - scrape_start
+            self._stats = stats
+
+        if key is not None:
+            cache.put(*key, result)
+
+        return result
+
+    def scrape_iter(
+        self, document: DocumentSource | Document = None
+    ) -> Iterator[tuple[str, str | list[str]]]:
+        """
+        Scrapes the given HTML document lazily, one value at a time.
 
-            attrs = build_attribs(rule.attributes)
+        Rules are evaluated in the order they were added. The elements of a rule are matched
+        and their values extracted as the iterator is consumed, so no lists of matches or
+        values are built, except with the single pass option where the traversal collects
+        the matches of every rule up front. The document must not be changed while iterating.
 
-            element = rule["element"]
-            if element:
-                data = curr_target.find_all(element, attrs=attrs)
+        Args:
+            document: optionally supply document that then override the current document,
+                      see the `html_doc` argument of the scraper for the accepted types.
+
+        Returns:
+            Iterator of (target, value) pairs.
+        """
+        if not self.__prepare(document):
+            return
+
+        matches = None
+        if self._options._single_pass:
+            if self._engine is None:
+                self._engine = TraversalEngine(list(self._plans.values()))
+
+            matches = self._engine.run(self._parser)
+
+        # Scopes of the child_of chain prefixes, shared by rules with common ancestors.
+        scopes = {}
+
+        for target, rule in self.rules.items():
+            plan = self._plans[target]
+
+            if matches is not None:
+                data = matches[target]
             else:
-                data = curr_target.find_all(attrs=attrs)
+                data = plan.iter_match(self._parser, scopes)
+
+            count = 0
+            for value in self.__iter_values(plan, data):
+                count += 1
+                yield target, value
 
-            if len(data) == 0:
+            if count == 0 and plan.select is None:
                 logger.warning(f"No data loaded for rule: {rule}")
-                result[target] = []
-                continue
 
-            # Check first if we want to parse properties instead of text.
-            property = rule["property"]
-            if property:
-                result[target] = [el[property] for el in data if el.has_attr(property)]
+    def __result_key(
+        self, document: DocumentSource | Document | None
+    ) -> tuple[str, str] | None:
+        """
+        Sets the document to scrape without parsing it and computes the key of its result.
+
+        Returns:
+            the document hash and the rule set hash, None if the document can't be scraped.
+        """
+        if document is not None:
+            # The document is parsed when the result is not cached.
+            self._document = read_source(document)
+            self._parser = None
+
+        if len(self.rules) == 0 or _document_size(self._document) == 0:
+            return None
+
+        source = self._document
+        parser = self._options._parser
+        if isinstance(source, Document):
+            source, parser = source.source, source.parser
+
+        # Shared documents are always parsed fully.
+        restricted = (
+            self._options._restrict_parse
+            and parser in RESTRICTABLE_PARSERS
+            and not isinstance(self._document, Document)
+        )
+
+        configuration = (parser, self._options._add_escapes, restricted)
+        if self._rule_set_hash is None or self._rule_set_hash[0] != configuration:
+            hashed = rule_set_hash(
+                list(self.rules.values()),
+                {
+                    "parser": parser,
+                    "add_escapes": self._options._add_escapes,
+                    "restrict_parse": restricted,
+                },
+            )
+            self._rule_set_hash = (configuration, hashed)
+
+        with open_source(source) as (markup, _):
+            return document_hash(markup), self._rule_set_hash[1]
+
+    def __prepare(self, document: DocumentSource | None) -> bool:
+        """
+        Sets the document to scrape and makes sure its tree is up to date.
+
+        Returns:
+            whether or not the document can be scraped.
+        """
+        if document is not None:
+            self.document = document
+
+        if len(self.rules) == 0:
+            logger.error("Can't scrape a document with 0 rules set.")
+            return False
+
+        if _document_size(self._document) == 0:
+            logger.error("Can't scrape an empty document.")
+            return False
+
+        # Rules were added after parsing a restricted tree, or parsing was deferred.
+        if self._stale or self._parser is None:
+            self._parser = self.__parse(self._document)
+
+        return True
+
+    def __match(
+        self, plan: RulePlan, stats: RuleStats | None, scopes: dict
+    ) -> list | None:
+        """
+        Finds the elements matching a rule.
+
+        Returns:
+            the matched elements or None if the child rules matched nothing.
+        """
+        if plan.select is not None:
+            return plan.match(self._parser)
+
+        if stats is not None:
+            start = time.perf_counter()
+
+        scope = plan.resolve_scope(self._parser, stats, scopes)
+
+        if stats is not None:
+            stats.child_of_time = time.perf_counter() - start
+
+        if not scope:
+            return None
+
+        return find_matches(scope, plan.step, stats)
+
+    def __extract(self, plan: RulePlan, data: list) -> list:
+        """Extracts the text or the property of the rule from the matched elements."""
+        values = list(self.__raw_values(plan, data))
+        return plan.pipeline(self._options._add_escapes).apply(values)
+
+    def __iter_values(self, plan: RulePlan, data: Iterable) -> Iterator:
+        """Extracts and transforms the value of each matched element."""
+        pipeline = plan.pipeline(self._options._add_escapes)
+
+        if not pipeline:
+            yield from self.__raw_values(plan, data)
+            return
+
+        for value in self.__raw_values(plan, data):
+            yield pipeline(value)
+
+    def __raw_values(self, plan: RulePlan, data: Iterable) -> Iterator:
+        """Extracts the text or the property of the rule from each matched element."""
+        if isinstance(plan, RecordPlan):
+            for container in data:
+                yield self.__extract_record(plan, container)
+            return
+
+        if plan.select is not None:
+            for tag in data:
+                yield tag.get_text()
+            return
+
+        # Check first if we want to parse properties instead of text.
+        property = plan.property
+        if property:
+            for el in data:
+                if el.has_attr(property):
+                    yield el[property]
+            return
+
+        for el in data:
+            yield el.get_text().strip()
+
+    def __extract_record(self, plan: RecordPlan, container) -> dict:
+        """Extracts the first value of every field within a container."""
+        matches = plan.engine.run(container)
+
+        return {
+            field.target: next(self.__iter_values(field, matches[field.target]), None)
+            for field in plan.fields
+        }
+
+    def scrape_many(
+        self,
+        documents: Iterable[DocumentSource | Document],
+        workers: int | None = None,
+        ordered: bool = True,
+        chunksize: int = 1,
+    ) -> Iterator["BatchResult"]:
+        """
+        Scrapes a batch of documents with the current rule set across a pool of processes.
+
+        The rule set and options are sent to each worker process once when the pool starts.
+        A document that fails to scrape is reported in its result and doesn't abort the batch.
+
+        Documents are taken from the iterable as results are consumed, at most two chunks per
+        worker are submitted ahead, so a lazy iterable of documents isn't held in memory.
+
+        Args:
+            documents: the HTML documents to scrape, passing paths avoids sending the
+                       documents to the worker processes.
+            workers: the amount of worker processes, defaults to the amount of CPUs.
+                     With a single worker the documents are scraped in the current process.
+            ordered: whether results are yielded in input order or as soon as they complete.
+            chunksize: the amount of documents sent to a worker at once when ordered.
+
+        Returns:
+            Iterator of batch results, one for each document.
+        """
+        if len(self.rules) == 0:
+            logger.error("Can't scrape a document with 0 rules set.")
+            return
+
+        rules = list(self.rules.values())
+        items = enumerate(documents)
+
+        if workers == 1:
+            _init_batch_worker(rules, self._options)
+            for item in items:
+                yield _scrape_batch_document(item)
+            return
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        max_in_flight = workers * 2
+        chunks = iter(lambda: list(islice(items, chunksize if ordered else 1)), [])
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(rules, self._options),
+        ) as executor:
+            if ordered:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(_scrape_batch_chunk, chunk))
+
+                    if len(pending) >= max_in_flight:
+                        yield from pending.popleft().result()
+
+                while pending:
+                    yield from pending.popleft().result()
             else:
-                result[target] = [el.get_text().strip() for el in data]
-                if self._options._add_escapes:
-                    result[target] = list(
-                        map(lambda x: self.__add_escapes(x), result[target])
-                    )
+                pending = set()
+                for chunk in chunks:
+                    pending.add(executor.submit(_scrape_batch_chunk, chunk))
+
+                    if len(pending) >= max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from future.result()
+
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+
+    def scrape_stream(
+        self, source, chunk_size: int = 65536, encoding: str = "utf-8"
+    ) -> Iterator[tuple[str, str]]:
+        """
+        Scrapes a document incrementally without building a tree or storing the document.
 
-        return result
+        The document is fed through a tokenizer and the rules are evaluated as the tags are opened
+        and closed, so very large documents can be scraped with bounded memory. Results are
+        identical to scraping with the html.parser backend, including how character references
+        are decoded, see `StreamMatcher`. Rules with CSS selectors and record rules are not
+        supported.
+
+        Args:
+            source: a string, bytes, a path, a text or binary file object or an iterable of
+                    chunks of the document.
+            chunk_size: the size of the chunks read from strings and files.
+            encoding: the encoding used for decoding binary input.
+
+        Returns:
+            Iterator of (target, value) pairs in document order.
+        Raises:
+            ScraperException: when a rule uses a CSS selector or is a record rule.
+        """
+        if len(self.rules) == 0:
+            logger.error("Can't scrape a document with 0 rules set.")
+            return
+
+        for plan in self._plans.values():
+            if plan.select is not None:
+                raise ScraperException(
+                    "Rules with CSS selectors can't be evaluated when streaming.",
+                    self.rules[plan.target],
+                )
+
+            if isinstance(plan, RecordPlan):
+                raise ScraperException(
+                    "Record rules can't be evaluated when streaming.",
+                    self.rules[plan.target],
+                )
+
+        matcher = StreamMatcher(list(self._plans.values()))
+
+        for chunk in iter_chunks(source, chunk_size, encoding):
+            matcher.feed(chunk)
+            yield from self.__stream_values(matcher.pop_matches())
+
+        matcher.close()
+        yield from self.__stream_values(matcher.pop_matches())
+
+    def __stream_values(self, matches):
+        """Applies the transforms of the rules to matches released by the stream matcher."""
+        add_escapes = self._options._add_escapes
+
+        for target, value in matches:
+            pipeline = self._plans[target].pipeline(add_escapes)
+            yield target, pipeline(value) if pipeline else value
 
     def reset(self):
         """
@@ -481,14 +1114,75 @@ class Scraper:
 
         Also clears the list of defined rules.
         """
-        self._parser = BeautifulSoup(self._document, DEFAULT_PARSER)
         self.rules = {}
+        self._plans = {}
+        self._engine = None
+        self._rule_set_hash = None
+        self._parser = self.__parse(self._document)
+
+    def __parse(self, document) -> BeautifulSoup:
+        """Parses the document with the parser backend set in the options."""
+        start = time.perf_counter()
+
+        # Shared documents are parsed by the document itself, at most once.
+        if isinstance(document, Document):
+            self._restricted = False
+            self._stale = False
+
+            tree = document.tree
+            self._parse_time = time.perf_counter() - start
+            return tree
+
+        with open_source(document) as (markup, encoding):
+            tree = self.__parse_markup(markup, encoding)
+
+        self._parse_time = time.perf_counter() - start
+        return tree
+
+    def __parse_markup(self, markup, encoding: str | None) -> BeautifulSoup:
+        """Parses opened markup, or returns the cached tree of the markup."""
+        roots = None
+        if (
+            self._options._restrict_parse
+            and self._options._parser in RESTRICTABLE_PARSERS
+        ):
+            roots = subtree_roots(list(self._plans.values()))
 
-    def __add_escapes(self, text: str) -> str:
-        """Adds escapes to single apostrophes"""
-        text = text.replace("'", "''")
-        text = text.replace('"', '""')
-        return text
+        self._restricted = roots is not None
+        self._stale = False
+
+        cache = self._options._parse_cache
+        if cache is not None:
+            key = (document_hash(markup), self._options._parser, roots)
+            tree = cache.get(key)
+
+            if tree is not None:
+                return tree
+
+        strainer = build_strainer(roots) if roots is not None else None
+        tree = BeautifulSoup(
+            as_markup(markup),
+            self._options._parser,
+            parse_only=strainer,
+            from_encoding=encoding,
+        )
+
+        if cache is not None:
+            cache.put(key, tree, source_size(markup))
+
+        return tree
+
+    def __validate_parser(self, options: ScraperOptions):
+        """Check that the parser backend is installed."""
+        if builder_registry.lookup(options._parser) is None:
+            raise ValueError(
+                f"Parser backend: {options._parser} is not available, make sure it is installed or use one of html5lib, lxml or html.parser."
+            )
+
+        if options._restrict_parse and options._parser not in RESTRICTABLE_PARSERS:
+            logger.warning(
+                f"The {options._parser} parser can't restrict parsing, documents will be parsed fully."
+            )
 
     @property
     def document(self):
@@ -496,8 +1190,13 @@ class Scraper:
 
     @document.setter
     def document(self, val):
-        self._document = val
-        self._parser = BeautifulSoup(val, DEFAULT_PARSER)
+        self._document = read_source(val)
+        self._parser = self.__parse(self._document)
+
+    @property
+    def stats(self) -> ScrapeStats | None:
+        """Profiling data of the latest scrape, None unless the profile option is set."""
+        return self._stats
 
     @property
     def options(self):
@@ -505,8 +1204,76 @@ class Scraper:
 
     @options.setter
     def options(self, val):
+        self.__validate_parser(val)
+        reparse = (
+            val._parser != self._options._parser
+            or val._restrict_parse != self._options._restrict_parse
+        )
         self._options = val
 
+        # The current tree was built by another backend or strainer.
+        if reparse and self._document is not None:
+            self._parser = self.__parse(self._document)
+
+
+@dataclass
+class BatchResult:
+    """The outcome of scraping a single document of a batch."""
+
+    # Position of the document in the batch.
+    index: int
+
+    # The scraped data, None if scraping failed.
+    result: dict | None
+
+    # The error that occurred when scraping failed.
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _document_size(document) -> int:
+    """Returns the length of a document source or a shared document."""
+    if isinstance(document, Document):
+        return document.size
+
+    return source_size(document)
+
+
+# Scraper of a batch worker process, set up once by the pool initializer.
+_batch_scraper = None
+
+
+def _init_batch_worker(rules: list[ScraperRule], options: ScraperOptions):
+    """Sets up the scraper of a batch worker process."""
+    global _batch_scraper
+    _batch_scraper = Scraper(rules=rules, options=options)
+
+
+def _scrape_batch_document(item: tuple[int, DocumentSource]) -> BatchResult:
+    """Scrapes a single document of a batch in a worker process."""
+    index, document = item
+
+    try:
+        document = read_source(document)
+        if document is None or _document_size(document) == 0:
+            raise ScraperException("Can't scrape an empty document.")
+
+        return BatchResult(index, _batch_scraper.scrape(document))
+    except Exception as e:
+        logger.error(f"Error with scraping document: {index}")
+        logger.error(e)
+        return BatchResult(index, None, e)
+
+
+def _scrape_batch_chunk(
+    items: list[tuple[int, DocumentSource]],
+) -> list[BatchResult]:
+    """Scrapes a chunk of documents of a batch in a worker process."""
+    return [_scrape_batch_document(item) for item in items]
+
 
 class ScraperException(Exception):
     """
@@ -0,0 +1,165 @@
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class RuleStats:
+    """Profiling data of a single rule during a scrape."""
+
+    # Total time spent on the rule in seconds.
+    wall_time: float = 0.0
+
+    # Time spent resolving the child_of chain in seconds.
+    child_of_time: float = 0.0
+
+    # Time spent extracting text or properties from the matched elements in seconds.
+    extract_time: float = 0.0
+
+    # Amount of subtrees walked to find the matches.
+    traversals: int = 0
+
+    # Amount of elements visited during the walks.
+    nodes_visited: int = 0
+
+    # Amount of elements the rule matched.
+    matched: int = 0
+
+
+@dataclass
+class ScrapeStats:
+    """
+    Profiling data of a scrape, collected when the profile scraper option is set.
+
+    With the single pass option the rules share one walk over the document, which is
+    recorded in the engine fields instead of the per rule traversal counts.
+    """
+
+    # Time spent parsing the scraped document in seconds, near zero on parse cache hits.
+    parse_time: float = 0.0
+
+    # Total time of the scrape in seconds, excluding parsing.
+    scrape_time: float = 0.0
+
+    # Time of the single pass walk over the document in seconds.
+    engine_time: float = 0.0
+
+    # Amount of elements visited by the single pass walk.
+    engine_nodes_visited: int = 0
+
+    # Statistics of each rule by target.
+    rules: dict[str, RuleStats] = field(default_factory=dict)
+
+    def add_rule(self, target: str) -> RuleStats:
+        """Starts collecting statistics for a rule."""
+        stats = RuleStats()
+        self.rules[target] = stats
+        return stats
+
+    def slowest(self, count: int = 5) -> list[tuple[str, RuleStats]]:
+        """Returns the rules that took the longest time."""
+        return sorted(
+            self.rules.items(), key=lambda item: item[1].wall_time, reverse=True
+        )[:count]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class InstanceStats:
+    """Utilization of a browser instance during a web scrape."""
+
+    # Amount of workers scraping pages with the instance.
+    workers: int = 0
+
+    # Amount of pages the workers scraped, including failures.
+    pages: int = 0
+
+    # Amount of pages that failed to scrape.
+    failures: int = 0
+
+    # Time the workers spent scraping pages in seconds, summed over the workers.
+    busy_time: float = 0.0
+
+    def utilization(self, elapsed: float) -> float:
+        """Returns the fraction of the elapsed time the workers were scraping pages."""
+        if elapsed <= 0 or self.workers == 0:
+            return 0.0
+
+        return self.busy_time / (self.workers * elapsed)
+
+
+@dataclass
+class PoolStats:
+    """
+    Statistics of the worker pool of a web scrape.
+
+    A queue that stays full while the instances are near full utilization means more
+    browser instances would help, instances that are mostly idle mean the pool size
+    can be reduced.
+    """
+
+    # Maximum amount of URLs waiting in the work queue.
+    queue_size: int = 0
+
+    # Largest amount of URLs that waited in the work queue.
+    peak_queue_depth: int = 0
+
+    # Sum of the sampled queue depths, for the mean depth.
+    queue_depth_total: int = 0
+
+    # Amount of times the queue depth was sampled.
+    queue_depth_samples: int = 0
+
+    # Duration of the scrape in seconds, updated when the scrape ends.
+    elapsed: float = 0.0
+
+    # Statistics of each browser instance, in the order of the instances.
+    instances: list[InstanceStats] = field(default_factory=list)
+
+    def sample_queue_depth(self, depth: int):
+        """Records the depth of the work queue."""
+        self.peak_queue_depth = max(self.peak_queue_depth, depth)
+        self.queue_depth_total += depth
+        self.queue_depth_samples += 1
+
+    @property
+    def mean_queue_depth(self) -> float:
+        if self.queue_depth_samples == 0:
+            return 0.0
+
+        return self.queue_depth_total / self.queue_depth_samples
+
+    def utilization(self) -> list[float]:
+        """Returns the utilization of each browser instance."""
+        return [instance.utilization(self.elapsed) for instance in self.instances]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class RequestStats:
+    """
+    Counters of the requests seen by the request filter of a web scrape.
+
+    Aborted requests are never sent, so only their amount is known, not their size.
+    """
+
+    # Amount of requests that were aborted.
+    blocked: int = 0
+
+    # Amount of requests that were let through.
+    allowed: int = 0
+
+    # Amount of aborted requests by resource type.
+    blocked_by_type: dict[str, int] = field(default_factory=dict)
+
+    def add_blocked(self, resource_type: str):
+        """Counts an aborted request."""
+        self.blocked += 1
+        self.blocked_by_type[resource_type] = (
+            self.blocked_by_type.get(resource_type, 0) + 1
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
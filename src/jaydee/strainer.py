@@ -0,0 +1,119 @@
+import re
+
+from bs4 import SoupStrainer
+
+from .plan import MatchStep, RulePlan, StartTag
+
+# The leftmost compound of a CSS selector that can be matched while parsing.
+SIMPLE_COMPOUND = re.compile(
+    r"^(?P<element>[a-zA-Z][\w-]*)?(?P<qualifiers>(?:[.#][\w-]+)*)$"
+)
+
+# Selector syntax that can match outside of the subtree of the leftmost compound.
+UNRESTRICTED_SYNTAX = re.compile(r"[,+~:\[\]*\\]")
+
+# Parsers whose trees are the same when restricted. html.parser closes open elements only
+# on the end tags of their ancestors, which are dropped from a restricted tree, so open
+# elements take in the text that follows them. html5lib doesn't support strainers.
+RESTRICTABLE_PARSERS = frozenset(["lxml"])
+
+
+def selector_root(selector: str) -> MatchStep | None:
+    """
+    Derives a step matching the ancestors of everything the selector matches.
+
+    Only selectors made of descendant or child combinators qualify, in which case every
+    match lies within an element matching the leftmost compound. The derived step may
+    match more elements than the compound, for example `.a.b` is matched as `.a` or `.b`.
+
+    Args:
+        selector: the CSS selector of a rule.
+    Returns:
+        the step for the leftmost compound, None if the selector can't be restricted.
+    """
+    if UNRESTRICTED_SYNTAX.search(selector):
+        return None
+
+    compounds = selector.replace(">", " ").split()
+    if not compounds:
+        return None
+
+    match = SIMPLE_COMPOUND.match(compounds[0])
+    if match is None:
+        return None
+
+    ids = set()
+    class_names = set()
+    for qualifier in re.findall(r"[.#][\w-]+", match["qualifiers"]):
+        if qualifier[0] == "#":
+            ids.add(qualifier[1:])
+        else:
+            class_names.add(qualifier[1:])
+
+    element = match["element"].lower() if match["element"] else None
+
+    return MatchStep(
+        element=element,
+        ids=frozenset(ids) if ids else None,
+        class_names=frozenset(class_names) if class_names else None,
+    )
+
+
+def subtree_roots(plans: list[RulePlan]) -> frozenset[MatchStep] | None:
+    """
+    Finds the steps whose subtrees contain every match of the rules.
+
+    Every match of a rule lies within an element matching the outermost step of the rule,
+    so only the elements matching one of the outermost steps need to be built, together
+    with their subtrees.
+
+    Args:
+        plans: the compiled plans of the active rules.
+    Returns:
+        the outermost steps, None if some rule needs the whole document.
+    """
+    roots = set()
+
+    for plan in plans:
+        if plan.select is not None:
+            root = selector_root(plan.select)
+        elif plan.scope_steps:
+            root = plan.scope_steps[0]
+        else:
+            root = plan.step
+
+        if root is None or root == MatchStep():
+            return None
+
+        roots.add(root)
+
+    if not roots:
+        return None
+
+    return frozenset(roots)
+
+
+def build_strainer(roots: frozenset[MatchStep]) -> SoupStrainer:
+    """
+    Builds a strainer that parses only the subtrees of the given roots.
+
+    Only parse with the strainer when the parser is in `RESTRICTABLE_PARSERS`, other
+    parsers may build the subtrees differently than a full parse does.
+
+    Args:
+        roots: the outermost steps of the rules, see `subtree_roots`.
+    Returns:
+        the strainer to parse documents with.
+    """
+    roots = tuple(roots)
+
+    def matches(name: str, attrs: dict) -> bool:
+        """Check if an element that is being parsed is the root of a reachable subtree."""
+        if isinstance(attrs.get("class"), str):
+            attrs = dict(attrs)
+            attrs["class"] = attrs["class"].split()
+
+        tag = StartTag(name, attrs)
+        return any(root.matches(tag) for root in roots)
+
+    return SoupStrainer(matches)
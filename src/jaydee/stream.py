@@ -0,0 +1,260 @@
+import codecs
+import os
+from collections import deque
+from html.parser import HTMLParser
+from typing import Iterable, Iterator
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution
+
+from .engine import TraversalEngine
+from .plan import RulePlan, StartTag
+
+# Elements whose text BeautifulSoup keeps out of the text of their ancestors.
+STRING_CONTAINERS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+
+# Elements that are closed as soon as they are opened.
+VOID_ELEMENTS = frozenset(HTMLTreeBuilder.empty_element_tags)
+
+# Attributes that BeautifulSoup splits into a list of values.
+LIST_ATTRIBUTES = HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+
+
+class _Match:
+    """A matched element whose value may still be waiting for its closing tag."""
+
+    __slots__ = ("target", "value", "container", "parts")
+
+    def __init__(self, target: str, value=None, container: str | None = None):
+        self.target = target
+        self.value = value
+
+        # The string container whose text is part of the value, None for plain text.
+        self.container = container
+        self.parts = [] if value is None else None
+
+
+class StreamMatcher(HTMLParser):
+    """
+    Evaluates compiled rules on the open and close tag events of a tokenizer.
+
+    No tree is built: the matcher only keeps the stack of open elements and the text
+    of the matched elements that are still open, so memory grows with the nesting depth
+    of the document and the size of the matched elements rather than the document size.
+
+    The events are interpreted like the `html.parser` backend of BeautifulSoup does,
+    including its decoding of character references, so the matches are identical to
+    scraping a text document with that backend. Numeric references below 256 are
+    decoded as Windows-1252 like BeautifulSoup does when it doesn't know the original
+    encoding, so binary documents in other encodings may differ for those references.
+    Matches are released in document order once they are complete.
+
+    Args:
+        plans: the compiled plans of the rules to evaluate, CSS selector rules are not supported.
+    """
+
+    def __init__(self, plans: list[RulePlan]):
+        # References are decoded by the handlers below, like BeautifulSoup does.
+        super().__init__(convert_charrefs=False)
+
+        self._engine = TraversalEngine(plans)
+        self._properties = {plan.target: plan.property for plan in plans}
+        self._active = [0] * self._engine.level_count
+
+        # Open elements as tuples of name, satisfied levels and started text matches.
+        self._stack = []
+
+        # Open string containers, the innermost one decides the type of the text.
+        self._containers = []
+
+        # Text matches that are still open.
+        self._captures = []
+
+        # Matches waiting for the earlier matches to complete.
+        self._pending = deque()
+        self._ready = []
+
+    def handle_starttag(self, tag, attrs):
+        self.__open(tag, attrs)
+
+        if tag in VOID_ELEMENTS:
+            self.__close()
+
+    def handle_startendtag(self, tag, attrs):
+        self.__open(tag, attrs)
+        self.__close()
+
+    def handle_endtag(self, tag):
+        # Like BeautifulSoup, close up to the most recent element with the same name.
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                while len(self._stack) > index:
+                    self.__close()
+                break
+
+    def handle_data(self, data):
+        if not self._captures:
+            return
+
+        container = self._containers[-1] if self._containers else None
+        for match in self._captures:
+            if match.container == container:
+                match.parts.append(data)
+
+    def handle_charref(self, name):
+        try:
+            codepoint = int(name[1:], 16) if name[:1] in "xX" else int(name)
+        except ValueError:
+            codepoint = -1
+
+        data = None
+
+        # Low references often point to Windows-1252 characters rather than code points.
+        if 0 <= codepoint < 256:
+            try:
+                data = bytes([codepoint]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+
+        if not data:
+            try:
+                data = chr(codepoint)
+            except (ValueError, OverflowError):
+                pass
+
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+
+        # Unknown entities are kept as the literal text.
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def unknown_decl(self, data):
+        if data.startswith("CDATA[") and self._captures:
+            for match in self._captures:
+                if match.container is None:
+                    match.parts.append(data[6:])
+
+    def close(self):
+        super().close()
+
+        while self._stack:
+            self.__close()
+
+    def pop_matches(self) -> list[tuple[str, str | list[str]]]:
+        """Returns the completed matches as (target, value) pairs and forgets them."""
+        ready = self._ready
+        self._ready = []
+        return ready
+
+    def __open(self, name: str, attrs: list[tuple[str, str | None]]):
+        """Matches an opened element against the rules."""
+        values = {}
+        for key, value in attrs:
+            values[key] = "" if value is None else value
+
+        if "class" in values:
+            values["class"] = values["class"].split()
+
+        satisfied = self._engine.match_tag(StartTag(name, values), self._active)
+
+        captures = []
+        for level in satisfied:
+            self._active[level.index] += 1
+
+            for target in level.targets:
+                property = self._properties[target]
+
+                if not property:
+                    match = _Match(target, container=name)
+                    if name not in STRING_CONTAINERS:
+                        match.container = None
+
+                    captures.append(match)
+                    self._captures.append(match)
+                    self._pending.append(match)
+                elif property in values:
+                    value = values[property]
+                    if isinstance(value, str) and self.__is_list(name, property):
+                        value = value.split()
+
+                    self._pending.append(_Match(target, value))
+
+        self._stack.append((name, satisfied, captures))
+
+        if name in STRING_CONTAINERS:
+            self._containers.append(name)
+
+        self.__release()
+
+    def __close(self):
+        """Closes the innermost open element."""
+        name, satisfied, captures = self._stack.pop()
+
+        for level in satisfied:
+            self._active[level.index] -= 1
+
+        for match in captures:
+            match.value = "".join(match.parts).strip()
+            match.parts = None
+            self._captures.remove(match)
+
+        if name in STRING_CONTAINERS:
+            self._containers.pop()
+
+        self.__release()
+
+    def __release(self):
+        """Moves completed matches to the ready list in document order."""
+        while self._pending and self._pending[0].parts is None:
+            match = self._pending.popleft()
+            self._ready.append((match.target, match.value))
+
+    def __is_list(self, name: str, property: str) -> bool:
+        """Check if BeautifulSoup would split the attribute into a list."""
+        return property in LIST_ATTRIBUTES["*"] or property in LIST_ATTRIBUTES.get(
+            name, ()
+        )
+
+
+def iter_chunks(
+    source: str | bytes | Iterable, chunk_size: int, encoding: str
+) -> Iterator[str]:
+    """
+    Splits a document source into text chunks.
+
+    Args:
+        source: a string, bytes, a path, a text or binary file object or an iterable of string
+                or bytes chunks.
+        chunk_size: the size of the chunks read from strings and files.
+        encoding: the encoding used for decoding bytes.
+    Returns:
+        iterator of text chunks.
+    """
+    if isinstance(source, os.PathLike):
+        with open(source, "rb") as file:
+            yield from iter_chunks(file, chunk_size, encoding)
+        return
+
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        chunks = (source[i : i + chunk_size] for i in range(0, len(source), chunk_size))
+    elif hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        chunks = iter(source)
+
+    decoder = None
+    for chunk in chunks:
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            chunk = decoder.decode(chunk)
+
+        if chunk:
+            yield chunk
+
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
@@ -0,0 +1,275 @@
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+# Whitespace sequences that are collapsed by normalize_whitespace.
+WHITESPACE = re.compile(r"\s+")
+
+
+class _Method:
+    """Calls a string method on the value."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+
+        return getattr(value, self.name)()
+
+
+class _NormalizeWhitespace:
+    """Collapses whitespace into single spaces and strips the value."""
+
+    __slots__ = ()
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+
+        return WHITESPACE.sub(" ", value).strip()
+
+
+class _Cast:
+    """Casts the value to a number, None when it isn't one."""
+
+    __slots__ = ("type",)
+
+    def __init__(self, type):
+        self.type = type
+
+    def __call__(self, value):
+        try:
+            return self.type(value)
+        except (TypeError, ValueError):
+            return None
+
+
+class _Regex:
+    """Captures a group of the first match of a pattern, None when nothing matches."""
+
+    __slots__ = ("pattern", "group")
+
+    def __init__(self, pattern: str, group: int | str | None = None):
+        self.pattern = re.compile(pattern)
+
+        # The first group when the pattern has groups, the whole match otherwise.
+        if group is None:
+            group = 1 if self.pattern.groups else 0
+
+        self.group = group
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+
+        match = self.pattern.search(value)
+        if match is None:
+            return None
+
+        return match.group(self.group)
+
+
+class _Replace:
+    """Replaces the matches of a pattern."""
+
+    __slots__ = ("pattern", "replacement")
+
+    def __init__(self, pattern: str, replacement: str):
+        self.pattern = re.compile(pattern)
+        self.replacement = replacement
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+
+        return self.pattern.sub(self.replacement, value)
+
+
+class _Date:
+    """Parses a date with a strptime format into ISO 8601, None when it doesn't match."""
+
+    __slots__ = ("format", "has_time")
+
+    def __init__(self, format: str):
+        self.format = format
+
+        # Formats without a time are returned as plain dates.
+        self.has_time = re.search(r"%[HIMSfpXcT]", format) is not None
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+
+        try:
+            parsed = datetime.strptime(value, self.format)
+        except ValueError:
+            return None
+
+        if self.has_time:
+            return parsed.isoformat()
+
+        return parsed.date().isoformat()
+
+
+class _AbsoluteUrl:
+    """Resolves a relative URL against a base URL."""
+
+    __slots__ = ("base",)
+
+    def __init__(self, base: str):
+        self.base = base
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+
+        return urljoin(self.base, value)
+
+
+class _Escape:
+    """Adds escapes to single apostrophes and quotes."""
+
+    __slots__ = ()
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+
+        return value.replace("'", "''").replace('"', '""')
+
+
+def _regex(argument):
+    if isinstance(argument, dict):
+        return _Regex(argument["pattern"], argument.get("group"))
+
+    return _Regex(argument)
+
+
+def _replace(argument):
+    if isinstance(argument, dict):
+        return _Replace(argument["pattern"], argument.get("with", ""))
+
+    pattern, replacement = argument
+    return _Replace(pattern, replacement)
+
+
+# Transforms without arguments, given by their name.
+SIMPLE_TRANSFORMS = {
+    "strip": _Method("strip"),
+    "lower": _Method("lower"),
+    "upper": _Method("upper"),
+    "normalize_whitespace": _NormalizeWhitespace(),
+    "int": _Cast(int),
+    "float": _Cast(float),
+    "escape": _Escape(),
+}
+
+# Transforms with an argument, given as a dictionary of the name mapped to the argument.
+ARGUMENT_TRANSFORMS = {
+    "regex": _regex,
+    "replace": _replace,
+    "date": _Date,
+    "absolute_url": _AbsoluteUrl,
+}
+
+
+class Pipeline:
+    """
+    A compiled sequence of transforms that is applied to every scraped value of a rule.
+
+    A transform that can't convert a value, such as a regex that doesn't match or a cast
+    of text that isn't a number, turns the value into None and the remaining transforms
+    are skipped, so the values stay aligned with the matched elements. Text transforms
+    pass values that are no longer text, such as numbers after `int`, through unchanged.
+
+    Args:
+        steps: the compiled transforms in the order they are applied.
+    """
+
+    __slots__ = ("steps",)
+
+    def __init__(self, steps: tuple = ()):
+        self.steps = tuple(steps)
+
+    def __call__(self, value):
+        # Attributes with multiple values, such as class, are transformed value by value.
+        if isinstance(value, list):
+            return [self(item) for item in value]
+
+        for step in self.steps:
+            if value is None:
+                return None
+
+            value = step(value)
+
+        return value
+
+    def apply(self, values: list) -> list:
+        """Applies the transforms to a list of values."""
+        if not self.steps:
+            return values
+
+        return [self(value) for value in values]
+
+    def then(self, *steps) -> "Pipeline":
+        """Returns a pipeline that applies the given transforms after these ones."""
+        return Pipeline(self.steps + steps)
+
+    def __bool__(self):
+        return bool(self.steps)
+
+
+def compile_transforms(specs: list | tuple | None) -> Pipeline:
+    """
+    Compiles declarative transform specifications into a pipeline.
+
+    A transform is either the name of a transform without arguments: `strip`, `lower`,
+    `upper`, `normalize_whitespace`, `int`, `float` and `escape`, or a dictionary with
+    a single key mapping a transform name to its argument:
+
+    - `{"regex": pattern}` or `{"regex": {"pattern": pattern, "group": group}}` captures
+      the first group of the first match, or the whole match when the pattern has no groups.
+    - `{"replace": [pattern, replacement]}` replaces the matches of a pattern.
+    - `{"date": format}` parses a date with a strptime format into ISO 8601.
+    - `{"absolute_url": base}` resolves relative URLs against the base URL.
+
+    Args:
+        specs: the transform specifications.
+    Returns:
+        the compiled pipeline.
+    Raises:
+        ValueError: when a transform is unknown or its argument is invalid.
+    """
+    steps = []
+
+    for spec in specs or ():
+        if isinstance(spec, str):
+            if spec not in SIMPLE_TRANSFORMS:
+                raise ValueError(f"Unknown transform: {spec}")
+
+            steps.append(SIMPLE_TRANSFORMS[spec])
+            continue
+
+        if not isinstance(spec, dict) or len(spec) != 1:
+            raise ValueError(
+                f"Invalid transform: {spec}, expected a name or a dictionary with a single key."
+            )
+
+        ((name, argument),) = spec.items()
+        if name not in ARGUMENT_TRANSFORMS:
+            raise ValueError(f"Unknown transform: {name}")
+
+        try:
+            steps.append(ARGUMENT_TRANSFORMS[name](argument))
+        except (re.error, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid argument for the {name} transform: {e}") from e
+
+    return Pipeline(steps)
+
+
+# Applied to the text of rules when the add_escapes scraper option is set.
+ESCAPE = SIMPLE_TRANSFORMS["escape"]
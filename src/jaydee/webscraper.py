@@ -1,8 +1,13 @@
 import asyncio
 import logging
+import time
 from copy import deepcopy
+from dataclasses import dataclass
+from typing import AsyncIterator
 
 from .scraper import Scraper
+from .router import ScraperRouter
+from .stats import InstanceStats, PoolStats, RequestStats
 from .options import WebScraperOptions
 from . import utils
 
@@ -11,65 +16,260 @@ from playwright.async_api import async_playwright
 logger = logging.getLogger("jd-webscraper")
 
 
+def _route(scraper: Scraper | ScraperRouter, url: str) -> Scraper | None:
+    """Returns the scraper for a url, routed when the scraper is a router."""
+    if isinstance(scraper, ScraperRouter):
+        return scraper.route(url)
+
+    return scraper
+
+
+@dataclass
+class PageResult:
+    """The outcome of scraping a single page."""
+
+    # The url of the page.
+    url: str
+
+    # The scraped data, None if scraping failed.
+    result: dict | None
+
+    # The error that occurred when scraping failed.
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Trick for attempting to bypass restrictions
+INIT_SCRIPT = "delete Object.getPrototypeOf(navigator).webdriver"
+
+# Clears the storage of the page's origin before the page is reused.
+CLEAR_STORAGE_SCRIPT = """() => {
+    try {
+        localStorage.clear();
+        sessionStorage.clear();
+    } catch (e) {}
+}"""
+
+
+class PagePool:
+    """
+    A pool of open pages of a browser context that are reused between scrapes.
+
+    Pages are created with the init script already added. After each use the storage
+    of the page is cleared and the page navigates to about:blank. Pages that were used
+    `max_uses` times, or fail to reset, are closed and replaced with a new page the next
+    time the pool is acquired from, so a page that can't be opened fails the scrape that
+    needs it rather than shrinking the pool.
+
+    Cookies belong to the browser context and are shared by its pages either way.
+
+    Args:
+        context: the browser context the pages are opened in.
+        size: the amount of pages in the pool.
+        max_uses: the amount of scrapes a page is used for before it's replaced.
+    """
+
+    def __init__(self, context, size: int, max_uses: int):
+        self.context = context
+        self.size = size
+        self.max_uses = max_uses
+
+        self._idle = asyncio.Queue()
+        self._uses = {}
+
+        self.created = 0
+        self.reused = 0
+
+    async def fill(self):
+        """Opens the pages of the pool."""
+        while self._idle.qsize() < self.size:
+            self._idle.put_nowait(await self.__new_page())
+
+    async def acquire(self):
+        """
+        Waits for an idle page, opening a new one in place of a closed page.
+
+        Raises:
+            Exception: when a new page can't be opened, the slot stays in the pool.
+        """
+        page = await self._idle.get()
+        if page is not None:
+            return page
+
+        try:
+            return await self.__new_page()
+        except BaseException:
+            self._idle.put_nowait(None)
+            raise
+
+    async def release(self, page):
+        """Resets a page and returns it to the pool, replacing it when it's used up."""
+        uses = self._uses.pop(page, 0) + 1
+
+        if uses < self.max_uses and not page.is_closed():
+            try:
+                await page.evaluate(CLEAR_STORAGE_SCRIPT)
+                await page.goto("about:blank")
+
+                self._uses[page] = uses
+                self._idle.put_nowait(page)
+                self.reused += 1
+                return
+            except Exception as e:
+                logger.warning("Failed to reset a pooled page, replacing it.")
+                logger.warning(e)
+
+        # The replacement is opened when the slot is acquired.
+        self._idle.put_nowait(None)
+
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            logger.warning("Failed to close a pooled page.")
+            logger.warning(e)
+
+    async def close(self):
+        """Closes the idle pages of the pool."""
+        while not self._idle.empty():
+            page = self._idle.get_nowait()
+            if page is None:
+                continue
+
+            self._uses.pop(page, None)
+
+            if not page.is_closed():
+                await page.close()
+
+    async def __new_page(self):
+        page = await self.context.new_page()
+        await page.add_init_script(INIT_SCRIPT)
+
+        self._uses[page] = 0
+        self.created += 1
+        return page
+
+
 class BrowserInstance:
-    def __init__(self, scraper, max_concurrent_tasks, wait_for_options):
+    def __init__(
+        self,
+        scraper,
+        max_concurrent_tasks,
+        wait_for_options,
+        request_filter_options=None,
+        request_stats=None,
+        page_reuse_limit=None,
+    ):
         self.scraper = scraper
         self.max_concurrent_tasks = max_concurrent_tasks
         self.semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
         self.wait_for_options = wait_for_options
+        self.request_filter_options = request_filter_options
+        self.request_stats = request_stats or RequestStats()
+        self.page_reuse_limit = page_reuse_limit
 
         self.pw_context = None
         self.browser = None
         self.browser_context = None
+        self.page_pool = None
+        self.owns_browser = False
 
-    async def setup(self):
-        """Sets up the browser instance"""
-        self.pw_context = await async_playwright().start()
-        self.browser = await self.pw_context.chromium.launch(headless=True)
+    async def setup(self, browser=None):
+        """
+        Sets up the browser instance.
+
+        Args:
+            browser: an optional shared browser to create the context in, otherwise the
+                     instance starts its own Playwright driver and browser.
+        """
+        if browser is None:
+            self.pw_context = await async_playwright().start()
+            self.browser = await self.pw_context.chromium.launch(headless=True)
+            self.owns_browser = True
+        else:
+            self.browser = browser
 
         self.browser_context = await self.browser.new_context(
             user_agent=utils.get_random_user_agent(),
             viewport={"width": 1920, "height": 1080},
         )
 
+        if self.request_filter_options is not None:
+            await self.request_filter_options.async_install(
+                self.browser_context, self.request_stats
+            )
+
+        if self.page_reuse_limit is not None:
+            self.page_pool = PagePool(
+                self.browser_context, self.max_concurrent_tasks, self.page_reuse_limit
+            )
+            await self.page_pool.fill()
+
         return self
 
     async def clean_up(self):
         """Closes all playwright related instances."""
+        if self.page_pool is not None:
+            await self.page_pool.close()
+
         await self.browser_context.close()
 
-        await self.browser.close()
-        await self.pw_context.stop()
+        # Shared browsers are closed by the webscraper.
+        if self.owns_browser:
+            await self.browser.close()
+            await self.pw_context.stop()
 
     async def scrape(self, url):
-        """Scrapes the given url with inner scraper object."""
-        async with self.semaphore:
-            page = await self.browser_context.new_page()
+        """
+        Scrapes the given url with inner scraper object.
 
-            # Trick for attempting to bypass restrictions
-            await page.add_init_script(
-                "delete Object.getPrototypeOf(navigator).webdriver"
-            )
+        With a router, the page is scraped with the scraper routed to the url and
+        pages without a route are not loaded, in which case None is returned.
+        """
+        scraper = _route(self.scraper, url)
+        if scraper is None:
+            logger.info(f"No route for {url}, skipping..")
+            return None
+
+        async with self.semaphore:
+            if self.page_pool is not None:
+                page = await self.page_pool.acquire()
+            else:
+                page = await self.browser_context.new_page()
+                await page.add_init_script(INIT_SCRIPT)
 
-            logger.info(f"Scraping {url}...")
-            await page.goto(url, timeout=5000)
-            await self.wait_for_options.async_wait_for(page)
+            try:
+                logger.info(f"Scraping {url}...")
+                await page.goto(url, timeout=5000)
+                await self.wait_for_options.async_wait_for(page)
 
-            content = await page.content()
-            result = self.scraper.scrape(content)
+                content = await page.content()
+            finally:
+                if self.page_pool is not None:
+                    await self.page_pool.release(page)
+                else:
+                    await page.close()
 
-            await page.close()
-            return result
+            return scraper.scrape(content)
 
 
 class WebScraper:
     """
     Webscraper allows scraping websites with given scraping rules and works concurrently.
+
+    Args:
+        scraper: the scraper for the pages, or a router that selects the scraper for each
+                 page by its url. Pages without a route are skipped before they are loaded.
+        urls: optional list of urls to scrape.
+        options: optionally add your own webscraper options.
     """
 
     def __init__(
         self,
-        scraper: Scraper,
+        scraper: Scraper | ScraperRouter,
         urls: list[str] = [],
         options: WebScraperOptions = WebScraperOptions(),
     ):
@@ -84,14 +284,23 @@ class WebScraper:
         self._total_failures = 0
         self._total_skipped = 0
         self._total = 0
+        self._pool_stats = None
+        self._request_stats = RequestStats()
 
         self.browser_instances = []
 
-    async def create_browser_instance(self):
+        # Playwright driver and browsers shared by the instances with the browser_processes option.
+        self._playwright = None
+        self._browsers = []
+
+    async def create_browser_instance(self, browser=None):
         """
         Creates a persistent browser instance.
 
         Remember to call quit after done scraping to clean up all browser instances.
+
+        Args:
+            browser: an optional shared browser to create the instance's context in.
         """
         if len(self.browser_instances) > self.options._multithread_options._pool_size:
             logger.error(
@@ -103,14 +312,38 @@ class WebScraper:
             scraper=deepcopy(self.scraper),
             max_concurrent_tasks=self.options._multithread_options._max_concurrent_tasks,
             wait_for_options=self.options._wait_for_options,
-        ).setup()
+            request_filter_options=self.options._request_filter_options,
+            request_stats=self._request_stats,
+            page_reuse_limit=self.options._multithread_options._page_reuse_limit,
+        ).setup(browser)
 
         self.browser_instances.append(browser)
 
     async def start(self):
-        """Starts a webscraper instance by creating underlying Playwright instances."""
-        for _ in range(self.options._multithread_options._pool_size):
-            await self.create_browser_instance()
+        """
+        Starts a webscraper instance by creating underlying Playwright instances.
+
+        With the browser_processes multithreading option, one Playwright driver starts
+        that many browsers and the contexts of the pool are spread over them, otherwise
+        each context gets a browser of its own.
+        """
+        pool_size = self.options._multithread_options._pool_size
+        browser_processes = self.options._multithread_options._browser_processes
+
+        if browser_processes is None:
+            for _ in range(pool_size):
+                await self.create_browser_instance()
+
+            return
+
+        self._playwright = await async_playwright().start()
+        for _ in range(min(browser_processes, pool_size)):
+            self._browsers.append(await self._playwright.chromium.launch(headless=True))
+
+        for index in range(pool_size):
+            await self.create_browser_instance(
+                self._browsers[index % len(self._browsers)]
+            )
 
     async def quit(self):
         """
@@ -121,6 +354,15 @@ class WebScraper:
 
         self.browser_instances = []
 
+        for browser in self._browsers:
+            await browser.close()
+
+        self._browsers = []
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
     async def scrape_pages(self):
         """
         Starts the page scraping coroutine.
@@ -129,9 +371,6 @@ class WebScraper:
             logger.error("No URLs in queue, unable to web scrape.")
             return
 
-        if len(self.browser_instances) == 0:
-            self.start()
-
         self._current_result = {
             "results": [],
             "success": 0,
@@ -139,8 +378,67 @@ class WebScraper:
         }
 
         try:
-            index = -1
-            tasks = []
+            async for page in self.scrape_pages_iter():
+                if page.ok:
+                    self.current_result["results"].append(page.result)
+                    self.current_result["success"] += 1
+                else:
+                    self.current_result["failures"] += 1
+
+            return self.current_result
+        except Exception as e:
+            logger.error("Error occurred in the webscraper page scraping coroutine:")
+            logger.error(e)
+
+    async def scrape_pages_iter(
+        self, queue_size: int | None = None
+    ) -> AsyncIterator[PageResult]:
+        """
+        Scrapes the queued pages, yielding each page as soon as it is scraped.
+
+        Every browser instance has as many workers as the max concurrent tasks
+        multithreading option. The workers pull URLs from a shared queue whenever they
+        are free, so a slow site only holds up the worker scraping it. Results are not
+        collected, so memory is bounded by the amount of workers and the queue size
+        rather than the size of the URL queue. Pages are yielded in the order they
+        complete, closing the generator early cancels the pages in flight.
+
+        Statistics of the queue and the utilization of the instances are available
+        in `pool_stats`.
+
+        Args:
+            queue_size: the maximum amount of URLs waiting for a worker, defaults to the
+                        amount of workers.
+        Yields:
+            PageResult of each scraped page, with the error when scraping failed.
+        """
+        if not self.url_queue:
+            logger.error("No URLs in queue, unable to web scrape.")
+            return
+
+        if len(self.browser_instances) == 0:
+            await self.start()
+
+        workers_per_instance = self.options._multithread_options._max_concurrent_tasks
+        worker_count = len(self.browser_instances) * workers_per_instance
+
+        if queue_size is None:
+            queue_size = worker_count
+
+        work = asyncio.Queue(maxsize=queue_size)
+        # Bounded so the workers wait for a slow consumer instead of piling up results.
+        results = asyncio.Queue(maxsize=worker_count)
+
+        stats = PoolStats(
+            queue_size=queue_size,
+            instances=[
+                InstanceStats(workers=workers_per_instance)
+                for _ in self.browser_instances
+            ],
+        )
+        self._pool_stats = stats
+
+        async def produce():
             while self.url_queue:
                 url = self.url_queue.pop()
 
@@ -149,43 +447,73 @@ class WebScraper:
                         f"Attempting to scrape invalid URL: {url}, skipping.."
                     )
                     self.total_skipped += 1
+                    self.total += 1
                     continue
 
-                index = (index + 1) % self.options._multithread_options._pool_size
-                instance = self.browser_instances[index]
+                if _route(self.scraper, url) is None:
+                    logger.info(f"No route for {url}, skipping..")
+                    self.total_skipped += 1
+                    self.total += 1
+                    continue
 
-                tasks.append(self.__scrape_page_from_pool(instance, url))
+                await work.put(url)
+                stats.sample_queue_depth(work.qsize())
 
-            await asyncio.gather(*tasks)
+            # Tells each worker that the queue is drained.
+            for _ in range(worker_count):
+                await work.put(None)
 
-            self.total_success += self.current_result["success"]
-            self.total_failures += self.current_result["failures"]
-            self.total += self.total_success + self.total_failures + self.total_skipped
+        async def consume(instance, instance_stats):
+            while True:
+                url = await work.get()
+                if url is None:
+                    break
 
-            return self.current_result
-        except Exception as e:
-            logger.error("Error occurred in the webscraper page scraping coroutine:")
-            logger.error(e)
+                started = time.perf_counter()
+                try:
+                    page = PageResult(url, await instance.scrape(url))
+                except Exception as e:
+                    page = PageResult(url, None, e)
+                    instance_stats.failures += 1
 
-    async def __scrape_page_from_pool(self, instance, url):
-        """
-        Scrape a webpage using a provided browser context.
+                instance_stats.busy_time += time.perf_counter() - started
+                instance_stats.pages += 1
+
+                await results.put(page)
+
+            await results.put(None)
+
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(produce())]
+        for instance, instance_stats in zip(self.browser_instances, stats.instances):
+            for _ in range(workers_per_instance):
+                tasks.append(asyncio.ensure_future(consume(instance, instance_stats)))
 
-        Args:
-            context: browser context provided by Playwright.
-            url: URL of the webpage to scrape.
-            scraper: instance of a scraper to scrape the page with.
-        """
         try:
-            result = await instance.scrape(url)
+            running = worker_count
+            while running:
+                page = await results.get()
+                if page is None:
+                    running -= 1
+                    continue
 
-            self.current_result["results"].append(result)
-            self.current_result["success"] += 1
-        except Exception as e:
-            self.current_result["failures"] += 1
+                self.total += 1
 
-            logger.error(f"Error with scraping url: {url}")
-            logger.error(e)
+                if page.ok:
+                    self.total_success += 1
+                else:
+                    self.total_failures += 1
+
+                    logger.error(f"Error with scraping url: {page.url}")
+                    logger.error(page.error)
+
+                yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            stats.elapsed = time.perf_counter() - start
 
     async def scrape_page(self, url: str):
         """
@@ -201,11 +529,11 @@ class WebScraper:
                 user_agent=utils.get_random_user_agent(),
                 viewport={"width": 1920, "height": 1080},
             )
-            page = await context.new_page()
-            # Trick for attempting to bypass restrictions
-            await page.add_init_script(
-                "delete Object.getPrototypeOf(navigator).webdriver"
+            await self.options._request_filter_options.async_install(
+                context, self._request_stats
             )
+            page = await context.new_page()
+            await page.add_init_script(INIT_SCRIPT)
             try:
                 if not utils.validate_url(url):
                     logger.warning(
@@ -213,11 +541,16 @@ class WebScraper:
                     )
                     return {}
 
+                scraper = _route(self.scraper, url)
+                if scraper is None:
+                    logger.info(f"No route for {url}, skipping..")
+                    return {}
+
                 await page.goto(url, timeout=self.options._timeout * 1000)
                 await self.options._wait_for_options.async_wait_for(page)
 
                 html = await page.content()
-                result = self.scraper.scrape(html)
+                result = scraper.scrape(html)
                 result["_content"] = html
 
                 return result
@@ -247,6 +580,16 @@ class WebScraper:
     def current_result(self, val):
         self.current_result = val
 
+    @property
+    def pool_stats(self) -> PoolStats | None:
+        """Statistics of the worker pool of the latest scrape, None before scraping."""
+        return self._pool_stats
+
+    @property
+    def request_stats(self) -> RequestStats:
+        """Counters of the requests blocked by the request filter options."""
+        return self._request_stats
+
     @property
     def total_success(self):
         return self._total_success
@@ -0,0 +1,201 @@
+import os
+import pickle
+from copy import deepcopy
+
+import pytest
+from bs4.builder import builder_registry
+
+import jaydee.scraper
+from jaydee.cache import ParseCache, ResultCache, RuleSetCache
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper, ScraperRule
+
+
+@pytest.fixture
+def test_rules():
+    return [ScraperRule(target="title", attributes={"element": "h1"})]
+
+
+def test_cached_documents_are_not_parsed(test_rules, mocker):
+    cache = ParseCache()
+    options = ScraperOptions(parse_cache=cache)
+    first = Scraper(rules=test_rules, options=options)
+    second = Scraper(rules=test_rules, options=options)
+
+    assert first.scrape("<h1>Cached</h1>") == {"title": ["Cached"]}
+
+    spy = mocker.spy(jaydee.scraper, "BeautifulSoup")
+    assert second.scrape("<h1>Cached</h1>") == {"title": ["Cached"]}
+
+    assert spy.call_count == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_eviction_by_entries():
+    cache = ParseCache(max_entries=2)
+    for key in ["a", "b", "c"]:
+        cache.put(key, key, 1)
+
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+    assert cache.evictions == 1
+
+
+def test_eviction_by_bytes():
+    cache = ParseCache(max_bytes=10)
+    cache.put("a", "a", 6)
+    cache.get("a")
+    cache.put("b", "b", 6)
+
+    # Least recently used entries are evicted first.
+    assert len(cache) == 1
+    assert cache.size == 6
+    assert cache.get("b") == "b"
+
+    # Documents larger than the whole cache are not cached.
+    cache.put("c", "c", 11)
+    assert cache.get("c") is None
+
+
+def test_cache_is_shared_by_copies():
+    cache = ParseCache(max_entries=4)
+    options = ScraperOptions(parse_cache=cache)
+
+    assert deepcopy(options)._parse_cache is cache
+
+    restored = pickle.loads(pickle.dumps(cache))
+    assert restored.max_entries == 4
+    assert len(restored) == 0
+
+
+def test_rule_cache(test_rules, tmp_path, mocker):
+    path = tmp_path / "rules.json"
+    Scraper(rules=test_rules).to_json(str(path))
+
+    cache = RuleSetCache(str(tmp_path / "cache"))
+    options = ScraperOptions(rule_cache=cache)
+
+    cold = Scraper(options=options).from_json(str(path))
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    spy = mocker.spy(jaydee.scraper, "RulePlan")
+    warm = Scraper(options=options).from_json(str(path))
+
+    # Cached rule sets are not compiled again.
+    assert spy.call_count == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert warm.rules == cold.rules
+    assert warm.scrape("<h1>Title</h1>") == {"title": ["Title"]}
+
+
+def test_rule_cache_invalidation(test_rules, tmp_path):
+    path = tmp_path / "rules.json"
+    Scraper(rules=test_rules).to_json(str(path))
+
+    cache = RuleSetCache(str(tmp_path / "cache"))
+    Scraper(options=ScraperOptions(rule_cache=cache)).from_json(str(path))
+
+    # Touching the file keeps the entry valid through the content hash.
+    os.utime(path, ns=(0, 0))
+    Scraper(options=ScraperOptions(rule_cache=cache)).from_json(str(path))
+    assert cache.hits == 1
+
+    # Rules validated with unknown tags allowed are not valid for strict scrapers.
+    other = RuleSetCache(str(tmp_path / "other"))
+    lenient = ScraperOptions(allow_unknown_tags=True, rule_cache=other)
+    Scraper(options=lenient).from_json(str(path))
+    Scraper(options=ScraperOptions(rule_cache=other)).from_json(str(path))
+    assert (other.hits, other.misses) == (0, 2)
+
+    rule = ScraperRule(target="text", attributes={"element": "p"})
+    Scraper(rules=[rule]).to_json(str(path), overwrite=True)
+
+    scraper = Scraper(options=ScraperOptions(rule_cache=cache)).from_json(str(path))
+    assert list(scraper.rules) == ["text"]
+    assert cache.hits == 1
+
+
+def test_rule_cache_directory_is_private(test_rules, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "home"))
+
+    path = tmp_path / "rules.json"
+    Scraper(rules=test_rules).to_json(str(path))
+
+    cache = RuleSetCache()
+    assert cache.directory == str(tmp_path / "home" / "jaydee" / "rules")
+
+    Scraper(options=ScraperOptions(rule_cache=cache)).from_json(str(path))
+    assert os.stat(cache.directory).st_mode & 0o777 == 0o700
+
+    (entry,) = os.listdir(cache.directory)
+    entry = os.path.join(cache.directory, entry)
+
+    # Entries others could have written are never unpickled.
+    os.chmod(entry, 0o666)
+    Scraper(options=ScraperOptions(rule_cache=cache)).from_json(str(path))
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    os.chmod(entry, 0o600)
+    os.chmod(cache.directory, 0o777)
+    Scraper(options=ScraperOptions(rule_cache=cache)).from_json(str(path))
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    os.chmod(cache.directory, 0o700)
+    Scraper(options=ScraperOptions(rule_cache=cache)).from_json(str(path))
+    assert cache.hits == 1
+
+
+def test_result_cache(test_rules, tmp_path, mocker):
+    cache = ResultCache(str(tmp_path / "results.db"))
+    options = ScraperOptions(result_cache=cache)
+
+    assert Scraper(rules=test_rules, options=options).scrape("<h1>A</h1>") == {
+        "title": ["A"]
+    }
+
+    spy = mocker.spy(jaydee.scraper, "BeautifulSoup")
+    scraper = Scraper(rules=test_rules, options=options)
+
+    # Cached results are returned without parsing the document.
+    assert scraper.scrape("<h1>A</h1>") == {"title": ["A"]}
+    assert spy.call_count == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Changing the rule set invalidates the cached results.
+    scraper.add_rule(ScraperRule(target="text", attributes={"element": "p"}))
+    assert scraper.scrape() == {"title": ["A"], "text": []}
+    assert spy.call_count == 1
+
+    # Copies sent to other processes share the database.
+    copy = pickle.loads(pickle.dumps(cache))
+    scraper = Scraper(rules=test_rules, options=ScraperOptions(result_cache=copy))
+    assert scraper.scrape("<h1>A</h1>") == {"title": ["A"]}
+    assert copy.hits == 1
+
+
+def test_result_cache_restricted_parse(test_rules, tmp_path):
+    if builder_registry.lookup("lxml") is None:
+        pytest.skip("Parser backend lxml is not installed.")
+
+    cache = ResultCache(str(tmp_path / "results.db"))
+
+    for restrict_parse in (False, True):
+        options = ScraperOptions(
+            parser="lxml", restrict_parse=restrict_parse, result_cache=cache
+        )
+        Scraper(rules=test_rules, options=options).scrape("<h1>A</h1>")
+
+    # Restricted and full parses don't share results.
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_result_cache_eviction(test_rules, tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"), max_bytes=60)
+    scraper = Scraper(rules=test_rules, options=ScraperOptions(result_cache=cache))
+
+    for title in ["First", "Second", "Third"]:
+        scraper.scrape(f"<h1>{title}</h1>")
+
+    assert cache.size <= 60
+    assert cache.evictions == 1
+    assert len(cache) == 2
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+import jaydee.document
+import jaydee.scraper
+from jaydee.document import Document
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper, ScraperRule
+
+
+@pytest.fixture
+def test_html():
+    return """
+    <div class="product"><h2>First</h2><a href="/first">More</a></div>
+    <div class="product"><h2>Second</h2><a href="/second">More</a></div>
+    """
+
+
+@pytest.fixture
+def scrapers():
+    return [
+        Scraper(rules=[ScraperRule(target="names", attributes={"element": "h2"})]),
+        Scraper(
+            rules=[
+                ScraperRule(
+                    target="links", attributes={"element": "a", "property": "href"}
+                )
+            ],
+            options=ScraperOptions(restrict_parse=True, single_pass=True),
+        ),
+    ]
+
+
+def test_document_is_parsed_once(test_html, scrapers, mocker):
+    spy = mocker.spy(jaydee.document, "BeautifulSoup")
+    scraper_spy = mocker.spy(jaydee.scraper, "BeautifulSoup")
+
+    document = Document(test_html, parser="html.parser")
+    assert not document.is_parsed
+
+    assert scrapers[0].scrape(document) == {"names": ["First", "Second"]}
+    assert scrapers[1].scrape(document) == {"links": ["/first", "/second"]}
+
+    # Adding rules and changing options keeps using the shared tree.
+    scrapers[0].add_rule(ScraperRule(target="more", attributes={"element": "a"}))
+    scrapers[0].options = ScraperOptions(parser="html5lib")
+    assert scrapers[0].scrape()["more"] == ["More", "More"]
+
+    assert spy.call_count == 1
+    assert scraper_spy.call_count == 0
+
+
+def test_concurrent_scraping(test_html, scrapers, mocker):
+    spy = mocker.spy(jaydee.document, "BeautifulSoup")
+    document = Document(test_html.encode("utf-8"))
+
+    results = [None] * 8
+
+    def scrape(index):
+        scraper = scrapers[index % 2]
+        results[index] = Scraper(rules=list(scraper.rules.values())).scrape(document)
+
+    threads = [threading.Thread(target=scrape, args=(i,)) for i in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert spy.call_count == 1
+    assert results[0] == {"names": ["First", "Second"]}
+    assert results[1] == {"links": ["/first", "/second"]}
+    assert results == results[:2] * 4
+
+
+def test_invalid_parser(test_html):
+    with pytest.raises(ValueError, match="not available"):
+        Document(test_html, parser="invalid")
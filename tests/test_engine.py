@@ -0,0 +1,75 @@
+import pytest
+
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper, ScraperRule
+
+
+@pytest.fixture
+def test_html():
+    return """
+    <div class="product" id="first">
+        <h2 class="name">Chair</h2>
+        <div class="details">
+            <span class="price sale">10</span>
+            <a href="/chair">More</a>
+        </div>
+    </div>
+    <div class="product">
+        <h2 class="name">Table</h2>
+        <div class="details">
+            <span class="price">20</span>
+            <div class="details"><span class="price">25</span></div>
+        </div>
+    </div>
+    <span class="price">0</span>
+    """
+
+
+@pytest.fixture
+def test_rules():
+    return [
+        ScraperRule(
+            target="names",
+            attributes={"element": "h2", "child_of": {"class_name": "product"}},
+        ),
+        ScraperRule(
+            target="prices",
+            attributes={
+                "element": "span",
+                "class_name": "price",
+                "child_of": {
+                    "element": "div",
+                    "class_name": "details",
+                    "child_of": {"element": "div", "class_name": "product"},
+                },
+            },
+        ),
+        ScraperRule(
+            target="sales",
+            attributes={"class_name": "sale other", "child_of": {"id": "first"}},
+        ),
+        ScraperRule(target="all_prices", attributes={"class_name": "price"}),
+        ScraperRule(target="links", attributes={"property": "href"}),
+        ScraperRule(target="selected", select="div.product > h2"),
+    ]
+
+
+def test_single_pass_matches_scrape(test_html, test_rules):
+    expected = Scraper(html_doc=test_html, rules=test_rules).scrape()
+
+    options = ScraperOptions(single_pass=True)
+    result = Scraper(html_doc=test_html, rules=test_rules, options=options).scrape()
+
+    assert result == expected
+    assert result["prices"] == ["10", "20", "25"]
+    assert result["sales"] == ["10"]
+
+
+def test_single_pass_after_adding_rules(test_html, test_rules):
+    options = ScraperOptions(single_pass=True)
+    scraper = Scraper(html_doc=test_html, rules=test_rules[:1], options=options)
+    assert list(scraper.scrape().keys()) == ["names"]
+
+    # Adding rules rebuilds the engine.
+    scraper.add_rules(test_rules[1:])
+    assert scraper.scrape()["all_prices"] == ["10", "20", "25", "0"]
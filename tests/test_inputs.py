@@ -0,0 +1,99 @@
+import io
+
+import pytest
+from bs4.builder import builder_registry
+
+from jaydee.cache import ParseCache
+from jaydee.inputs import sniff_encoding
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper, ScraperRule
+
+DOCUMENT = (
+    '<html><head><meta charset="{}"></head><body><h1>Café – naïve</h1></body></html>'
+)
+
+
+@pytest.fixture
+def test_rules():
+    return [ScraperRule(target="title", attributes={"element": "h1"})]
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"\xef\xbb\xbf<p>", "utf-8"),
+        (b"\xff\xfe<\x00p\x00", "utf-16le"),
+        (b"\xff\xfe\x00\x00<\x00\x00\x00", "utf-32le"),
+        (b'<meta charset="windows-1252">', "cp1252"),
+        (
+            b'<meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-1">',
+            "iso8859-1",
+        ),
+        (b'<meta charset="utf-16">', "utf-8"),
+        (b'<meta charset="unknown">', None),
+        (b"<p>no declaration</p>", None),
+        (b" " * 2000 + b'<meta charset="latin-1">', None),
+    ],
+)
+def test_sniff_encoding(data, expected):
+    assert sniff_encoding(data) == expected
+
+
+@pytest.mark.parametrize("parser", ["html5lib", "lxml", "html.parser"])
+@pytest.mark.parametrize("encoding", ["utf-8", "windows-1252"])
+def test_binary_sources(test_rules, tmp_path, parser, encoding):
+    if builder_registry.lookup(parser) is None:
+        pytest.skip(f"Parser backend {parser} is not installed.")
+
+    data = DOCUMENT.format(encoding).encode(encoding)
+    path = tmp_path / "page.html"
+    path.write_bytes(data)
+
+    options = ScraperOptions(parser=parser)
+    expected = {"title": ["Café – naïve"]}
+
+    for source in [data, memoryview(data), io.BytesIO(data), path]:
+        scraper = Scraper(html_doc=source, rules=test_rules, options=options)
+        assert scraper.scrape() == expected
+
+
+def test_file_sources_can_be_parsed_again(test_rules):
+    scraper = Scraper(
+        html_doc=io.BytesIO(b"<h1>Title</h1><p>Text</p>"),
+        rules=test_rules,
+        options=ScraperOptions(parser="html.parser"),
+    )
+
+    # The added rule marks the tree stale, so the file is parsed again.
+    scraper.add_rule(ScraperRule(target="text", attributes={"element": "p"}))
+
+    assert scraper.scrape() == {"title": ["Title"], "text": ["Text"]}
+
+
+def test_empty_path(test_rules, tmp_path):
+    path = tmp_path / "empty.html"
+    path.write_bytes(b"")
+
+    assert Scraper(html_doc=path, rules=test_rules).scrape() == {}
+
+
+def test_cached_paths(test_rules, tmp_path):
+    path = tmp_path / "page.html"
+    path.write_bytes(b"<h1>Cached</h1>")
+
+    cache = ParseCache()
+    scraper = Scraper(rules=test_rules, options=ScraperOptions(parse_cache=cache))
+
+    assert scraper.scrape(path) == {"title": ["Cached"]}
+    assert scraper.scrape(path.read_bytes()) == {"title": ["Cached"]}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stream_path(test_rules, tmp_path):
+    path = tmp_path / "page.html"
+    path.write_bytes(DOCUMENT.format("utf-8").encode("utf-8"))
+
+    scraper = Scraper(rules=test_rules)
+    assert list(scraper.scrape_stream(path, chunk_size=7)) == [
+        ("title", "Café – naïve")
+    ]
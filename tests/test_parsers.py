@@ -0,0 +1,152 @@
+import pytest
+
+from bs4.builder import builder_registry
+
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper, ScraperRule
+
+# Conformance of the supported parser backends.
+#
+# Each case pairs a document with rules and lists the backends that produce
+# results identical to html5lib, the default backend. Backends missing from a
+# case are known to build a different tree for that markup.
+PARSERS = ["html5lib", "lxml", "html.parser"]
+
+
+@pytest.fixture(scope="module")
+def well_formed_html():
+    return """
+    <!DOCTYPE html>
+    <html>
+    <head><title>Conformance</title></head>
+    <body>
+    <div id="main" class="container wide">
+        <h1 class="title">Heading</h1>
+        <div class="nested">
+            <p>First &amp; foremost</p>
+            <p class="note">Second</p>
+        </div>
+        <ul class="links">
+            <li><a href="/home">Home</a></li>
+            <li><a href="/faq" class="faq">FAQ</a></li>
+        </ul>
+    </div>
+    <span id="footer">Footer</span>
+    </body>
+    </html>
+    """
+
+
+RULE_CASES = {
+    "element": [ScraperRule(target="t", attributes={"element": "p"})],
+    "class_name": [
+        ScraperRule(target="t", attributes={"element": "h1", "class_name": "title"})
+    ],
+    "multiple_class_names": [
+        ScraperRule(target="t", attributes={"element": "p", "class_name": "note x"})
+    ],
+    "id": [ScraperRule(target="t", attributes={"element": "span", "id": "footer"})],
+    "property": [
+        ScraperRule(target="t", attributes={"element": "a", "property": "href"})
+    ],
+    "child_of": [
+        ScraperRule(
+            target="t",
+            attributes={
+                "element": "p",
+                "child_of": {
+                    "element": "div",
+                    "class_name": "nested",
+                    "child_of": {"element": "div", "id": "main"},
+                },
+            },
+        )
+    ],
+    "select": [ScraperRule(target="t", select="ul.links > li a.faq")],
+}
+
+MALFORMED_CASES = {
+    # lxml and html.parser keep the whitespace between nested elements in the text.
+    "nested_text": (
+        '<div class="x">\n    <p>a</p>\n    <p>b</p>\n</div>',
+        ScraperRule(target="t", attributes={"element": "div", "class_name": "x"}),
+        ["html5lib"],
+    ),
+    # html5lib inserts the implicit tbody element.
+    "implicit_tbody": (
+        "<table><tr><td>a</td></tr></table>",
+        ScraperRule(
+            target="t", attributes={"element": "td", "child_of": {"element": "tbody"}}
+        ),
+        ["html5lib"],
+    ),
+    # html.parser doesn't close paragraphs implicitly.
+    "unclosed_paragraphs": (
+        '<div class="x"><p>one<p>two</div>',
+        ScraperRule(target="t", attributes={"element": "p"}),
+        ["html5lib", "lxml"],
+    ),
+    # html.parser doesn't close list items implicitly.
+    "unclosed_list_items": (
+        "<ul><li>a<li>b</ul>",
+        ScraperRule(target="t", attributes={"element": "li"}),
+        ["html5lib", "lxml"],
+    ),
+    # A block element inside a paragraph closes it, except for html.parser.
+    "block_in_paragraph": (
+        '<p class="c">a<div>b</div></p>',
+        ScraperRule(target="t", attributes={"element": "p", "class_name": "c"}),
+        ["html5lib", "lxml"],
+    ),
+    # Misnested inline elements are recovered identically.
+    "misnested_inline": (
+        '<div class="x"><b><i>t</b></i></div>',
+        ScraperRule(
+            target="t",
+            attributes={"element": "i", "child_of": {"element": "div"}},
+        ),
+        PARSERS,
+    ),
+}
+
+
+def scrape(html, rules, parser):
+    if builder_registry.lookup(parser) is None:
+        pytest.skip(f"Parser backend {parser} is not installed.")
+
+    options = ScraperOptions(parser=parser)
+    return Scraper(html_doc=html, rules=rules, options=options).scrape()
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("case", RULE_CASES.keys())
+def test_well_formed_conformance(well_formed_html, parser, case):
+    rules = RULE_CASES[case]
+
+    expected = scrape(well_formed_html, rules, "html5lib")
+    assert scrape(well_formed_html, rules, parser) == expected
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("case", MALFORMED_CASES.keys())
+def test_malformed_conformance(parser, case):
+    html, rule, identical = MALFORMED_CASES[case]
+
+    expected = scrape(html, [rule], "html5lib")
+    result = scrape(html, [rule], parser)
+
+    assert (result == expected) == (parser in identical)
+
+
+def test_invalid_parser():
+    with pytest.raises(ValueError, match="Parser backend"):
+        Scraper(options=ScraperOptions(parser="not-a-parser"))
+
+
+def test_switching_parser_reparses():
+    rules = MALFORMED_CASES["implicit_tbody"][1]
+    scraper = Scraper(html_doc="<table><tr><td>a</td></tr></table>", rules=[rules])
+    assert scraper.scrape()["t"] == ["a"]
+
+    scraper.options = ScraperOptions(parser="html.parser")
+    assert scraper.scrape()["t"] == []
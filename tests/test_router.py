@@ -0,0 +1,42 @@
+import pytest
+
+from jaydee.router import ScraperRouter
+from jaydee.scraper import Scraper, ScraperRule
+
+
+@pytest.fixture
+def scrapers():
+    return {
+        name: Scraper(rules=[ScraperRule(target=name, attributes={"element": "h1"})])
+        for name in ["products", "product", "search", "fallback"]
+    }
+
+
+def test_longest_prefix(scrapers):
+    router = (
+        ScraperRouter()
+        .add_prefix("https://example.com/products", scrapers["products"])
+        .add_prefix("https://example.com/products/", scrapers["product"])
+    )
+
+    assert router.route("https://example.com/products") is scrapers["products"]
+    assert router.route("https://example.com/products/1") is scrapers["product"]
+    assert router.route("https://example.com/about") is None
+
+
+def test_patterns(scrapers):
+    router = (
+        ScraperRouter(default=scrapers["fallback"])
+        .add_prefix("https://example.com/products/", scrapers["product"])
+        .add_pattern(r"[?&]q=", scrapers["search"])
+    )
+
+    # Prefixes take precedence over patterns.
+    assert router.route("https://example.com/products/?q=1") is scrapers["product"]
+    assert router.route("https://example.com/find?q=shoes") is scrapers["search"]
+    assert router.route("https://example.com/") is scrapers["fallback"]
+
+
+def test_invalid_pattern(scrapers):
+    with pytest.raises(ValueError, match="Invalid URL pattern"):
+        ScraperRouter().add_pattern("(unclosed", scrapers["search"])
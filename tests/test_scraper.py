@@ -1,7 +1,13 @@
+import json
+import pickle
+
 import pytest
+from bs4 import Tag
 
+import jaydee.plan
+import jaydee.scraper
 from jaydee.options import ScraperOptions
-from jaydee.scraper import Scraper, ScraperRule
+from jaydee.scraper import RecordRule, Scraper, ScraperException, ScraperRule
 
 
 @pytest.fixture(scope="class")
@@ -170,6 +176,58 @@ def test_target_validation():
         ]
 
 
+def test_rules_are_immutable():
+    attributes = {"element": "a", "child_of": {"element": "div", "class_name": "links"}}
+    rule = ScraperRule(target="links", attributes=attributes)
+
+    with pytest.raises(AttributeError):
+        rule._target = "other"
+
+    with pytest.raises(TypeError):
+        rule.attributes["element"] = "p"
+
+    with pytest.raises(TypeError):
+        rule["child_of"]["element"] = "p"
+
+    # Changing the constructor arguments doesn't change the rule.
+    attributes["child_of"]["element"] = "p"
+    assert rule["child_of"]["element"] == "div"
+
+    copy = pickle.loads(pickle.dumps(rule))
+    assert copy == rule and hash(copy) == hash(rule)
+    assert rule != ScraperRule(target="links", attributes=attributes)
+
+
+def test_rules_to_json(scraper, test_rules, tmp_path):
+    scraper.reset()
+    scraper.add_rules(test_rules)
+
+    path = tmp_path / "rules.json"
+    scraper.to_json(str(path))
+
+    loaded = Scraper().from_json(str(path))
+    assert list(loaded.rules.values()) == test_rules
+
+
+def test_selector_validation(scraper):
+    # Invalid selectors are reported when the rule is added, not when scraping.
+    scraper.reset()
+    with pytest.raises(ScraperException, match="Invalid CSS selector"):
+        scraper.add_rule(ScraperRule(target="title", select="div >> p"))
+
+    assert "title" not in scraper.rules
+
+
+def test_selectors_are_compiled_once(test_html, mocker):
+    spy = mocker.spy(jaydee.plan.soupsieve, "compile")
+    scraper = Scraper(rules=[ScraperRule(target="quote", select="div.container > h2")])
+
+    for _ in range(3):
+        assert scraper.scrape(test_html)["quote"] == ["'quoted'"]
+
+    assert spy.call_count == 1
+
+
 def test_adding_escapes(scraper, test_rules_for_escapes):
     # Assert that escapes are replaced with double escapes
     options = ScraperOptions(add_escapes=True)
@@ -183,3 +241,278 @@ def test_adding_escapes(scraper, test_rules_for_escapes):
     assert result["title"] == ["''quoted''"]
 
     scraper.options = ScraperOptions()
+
+
+def test_child_of_scrapes_live_tree(scraper, test_rules, mocker):
+    # Make sure we are running a fresh instance.
+    scraper.reset()
+    scraper.add_rules(test_rules)
+
+    spy = mocker.spy(jaydee.scraper, "BeautifulSoup")
+    result = scraper.scrape()
+
+    # Resolving child rules must not parse the document again.
+    assert spy.call_count == 0
+    assert result["body"] == ["Paragraph"]
+
+
+def test_shared_child_of_prefixes(mocker):
+    html = """
+    <div class="product">
+        <div class="details"><span class="name">Name</span><span class="price">1.99</span></div>
+        <a href="/product">More</a>
+    </div>
+    """
+    product = {"element": "div", "class_name": "product"}
+    details = {"element": "div", "class_name": "details", "child_of": product}
+    rules = [
+        ScraperRule(
+            target="names", attributes={"class_name": "name", "child_of": details}
+        ),
+        ScraperRule(
+            target="prices", attributes={"class_name": "price", "child_of": details}
+        ),
+        ScraperRule(
+            target="links",
+            attributes={"element": "a", "property": "href", "child_of": product},
+        ),
+    ]
+    scraper = Scraper(html_doc=html, rules=rules)
+
+    spy = mocker.spy(jaydee.plan, "find_matches")
+    result = scraper.scrape()
+
+    # Every distinct level of the child_of chains is resolved once.
+    assert spy.call_count == 2
+    assert result == {"names": ["Name"], "prices": ["1.99"], "links": ["/product"]}
+
+
+def test_nested_child_of_matches():
+    html = """
+    <div class="outer">
+        <div class="outer">
+            <p>First</p>
+        </div>
+        <p>Second</p>
+    </div>
+    """
+    rule = ScraperRule(
+        target="paragraphs",
+        attributes={
+            "element": "p",
+            "child_of": {"element": "div", "class_name": "outer"},
+        },
+    )
+    result = Scraper(html_doc=html, rules=[rule]).scrape()
+
+    # Nested containers don't produce duplicate matches.
+    assert result["paragraphs"] == ["First", "Second"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scrape_many(test_html, test_rules, workers):
+    scraper = Scraper(rules=test_rules)
+    documents = [test_html, "", test_html.replace("Heading", "Other")]
+
+    results = list(scraper.scrape_many(documents, workers=workers))
+
+    # Results are in input order and a failing document doesn't abort the batch.
+    assert [res.index for res in results] == [0, 1, 2]
+    assert results[0].result["title"] == ["Heading"]
+    assert not results[1].ok
+    assert results[2].result["title"] == ["Other"]
+
+
+def test_scrape_many_unordered(test_html, test_rules):
+    scraper = Scraper(rules=test_rules)
+
+    results = list(scraper.scrape_many([test_html] * 4, workers=2, ordered=False))
+
+    assert sorted(res.index for res in results) == [0, 1, 2, 3]
+    assert all(res.result["body"] == ["Paragraph"] for res in results)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_scrape_many_consumes_documents_lazily(test_html, test_rules, ordered):
+    scraper = Scraper(rules=test_rules)
+    produced = 0
+
+    def documents():
+        nonlocal produced
+        for _ in range(50):
+            produced += 1
+            yield test_html
+
+    results = scraper.scrape_many(documents(), workers=2, ordered=ordered)
+    assert next(results).ok
+
+    # Two documents per worker are submitted ahead of the consumed results.
+    assert produced <= 5
+
+    assert len(list(results)) == 49
+    assert produced == 50
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_profiling(test_html, test_rules, single_pass):
+    options = ScraperOptions(profile=True, single_pass=single_pass)
+    scraper = Scraper(html_doc=test_html, rules=test_rules, options=options)
+    scraper.scrape()
+
+    stats = scraper.stats
+    assert stats.parse_time > 0
+    assert set(stats.rules.keys()) == {"title", "body"}
+    assert stats.rules["body"].matched == 1
+    assert stats.rules["body"].wall_time >= stats.rules["body"].extract_time
+
+    if single_pass:
+        assert stats.engine_nodes_visited > 0
+    else:
+        # One walk for the document, the container and the nested element.
+        assert stats.rules["body"].traversals == 3
+        assert stats.rules["body"].nodes_visited > 0
+
+
+def test_profiling_disabled(scraper, test_rules):
+    scraper.reset()
+    scraper.add_rules(test_rules)
+    scraper.scrape()
+
+    assert scraper.stats is None
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ScraperOptions(),
+        ScraperOptions(single_pass=True),
+        ScraperOptions(add_escapes=True),
+    ],
+)
+def test_scrape_iter(test_html, test_rules, test_rules_for_properties, options):
+    rules = test_rules + [ScraperRule(target="quote", select="div.container > h2")]
+    rules += test_rules_for_properties
+    scraper = Scraper(html_doc=test_html, rules=rules, options=options)
+
+    values = {}
+    for target, value in scraper.scrape_iter():
+        values.setdefault(target, []).append(value)
+
+    expected = {target: data for target, data in scraper.scrape().items() if data}
+    assert values == expected
+
+
+def test_scrape_iter_is_lazy(test_rules_for_properties, mocker):
+    html = "<div class='links'>" + "<a href='/link'>Link</a>" * 1000 + "</div>"
+    scraper = Scraper(html_doc=html, rules=test_rules_for_properties)
+
+    spy = mocker.spy(Tag, "has_attr")
+    values = scraper.scrape_iter()
+
+    assert next(values) == ("links", "/link")
+    assert next(values) == ("links", "/link")
+
+    # Only the consumed values were extracted.
+    assert spy.call_count == 2
+
+
+@pytest.fixture
+def test_record_html():
+    return """
+    <div class="product">
+        <h2 class="name">First</h2>
+        <div class="details"><span class="price">1.99</span></div>
+        <a href="/first">More</a>
+    </div>
+    <div class="product">
+        <h2 class="name">Second</h2>
+        <a href="/second">More</a>
+    </div>
+    """
+
+
+@pytest.fixture
+def test_record_rule():
+    return RecordRule(
+        target="products",
+        attributes={"element": "div", "class_name": "product"},
+        fields=[
+            ScraperRule(target="name", attributes={"element": "h2"}),
+            ScraperRule(
+                target="price",
+                attributes={
+                    "element": "span",
+                    "child_of": {"element": "div", "class_name": "details"},
+                },
+            ),
+            ScraperRule(target="link", attributes={"element": "a", "property": "href"}),
+            ScraperRule(target="more", select="a"),
+        ],
+    )
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_record_rules(test_record_html, test_record_rule, single_pass):
+    scraper = Scraper(
+        html_doc=test_record_html,
+        rules=[test_record_rule],
+        options=ScraperOptions(single_pass=single_pass),
+    )
+
+    # Missing fields are None instead of shifting the values of later records.
+    assert scraper.scrape() == {
+        "products": [
+            {"name": "First", "price": "1.99", "link": "/first", "more": "More"},
+            {"name": "Second", "price": None, "link": "/second", "more": "More"},
+        ]
+    }
+
+
+def test_record_rules_to_json(test_record_rule, tmp_path):
+    path = tmp_path / "rules.json"
+    Scraper(rules=[test_record_rule]).to_json(str(path))
+
+    loaded = Scraper().from_json(str(path))
+    assert loaded.rules == {"products": test_record_rule}
+    assert pickle.loads(pickle.dumps(test_record_rule)) == test_record_rule
+
+
+def test_record_rule_validation():
+    with pytest.raises(ValueError, match="Duplicate record field"):
+        RecordRule(
+            target="products",
+            attributes={"class_name": "product"},
+            fields=[
+                ScraperRule(target="name", attributes={"element": "h2"}),
+                ScraperRule(target="name", attributes={"element": "h3"}),
+            ],
+        )
+
+    rule = RecordRule(
+        target="products",
+        attributes={"class_name": "product"},
+        fields=[ScraperRule(target="name", attributes={"element": "dib"})],
+    )
+    with pytest.raises(ValueError, match="Invalid HTML element"):
+        Scraper(rules=[rule])
+
+
+def test_record_rule_transforms(test_record_html):
+    with pytest.raises(ValueError, match="add them to its fields"):
+        RecordRule(
+            target="products",
+            attributes={"class_name": "product"},
+            fields=[ScraperRule(target="name", attributes={"element": "h2"})],
+            transforms=["upper"],
+        )
+
+    rule = RecordRule(
+        target="products",
+        attributes={"element": "div", "class_name": "product"},
+        fields=[
+            {"target": "name", "attributes": {"element": "h2"}, "transforms": ["upper"]}
+        ],
+    )
+
+    scraper = Scraper(html_doc=test_record_html).from_json(json.dumps([rule.to_dict()]))
+    assert scraper.scrape() == {"products": [{"name": "FIRST"}, {"name": "SECOND"}]}
@@ -0,0 +1,114 @@
+import pytest
+from bs4.builder import builder_registry
+
+from jaydee.options import ScraperOptions
+from jaydee.plan import MatchStep, RulePlan
+from jaydee.scraper import Scraper, ScraperRule
+from jaydee.strainer import selector_root, subtree_roots
+
+
+@pytest.fixture
+def test_html():
+    return """
+    <html>
+    <head><style>.product { color: red; }</style></head>
+    <body>
+    <script>var products = [];</script>
+    <div class="product"><h2>Chair</h2><a href="/chair">More</a></div>
+    <svg><path d="M0 0"></path></svg>
+    <div class="product"><h2>Table</h2><a href="/table">More</a></div>
+    <a href="/outside">Outside</a>
+    </body>
+    </html>
+    """
+
+
+@pytest.fixture
+def test_rules():
+    return [
+        ScraperRule(
+            target="names",
+            attributes={"element": "h2", "child_of": {"class_name": "product"}},
+        ),
+        ScraperRule(target="links", select="div.product > a"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "selector, root",
+    [
+        ("div.product > a", MatchStep("div", None, frozenset(["product"]))),
+        ("#main p", MatchStep(None, frozenset(["main"]), None)),
+        ("UL li", MatchStep("ul", None, None)),
+        ("h2 + p", None),
+        ("div:first-child p", None),
+        ("a[href]", None),
+        ("div, p", None),
+    ],
+)
+def test_selector_root(selector, root):
+    assert selector_root(selector) == root
+
+
+def test_unrestricted_rules():
+    rule = ScraperRule(target="links", attributes={"property": "href"})
+    assert subtree_roots([RulePlan(rule)]) is None
+
+
+def require(parser):
+    if builder_registry.lookup(parser) is None:
+        pytest.skip(f"Parser backend {parser} is not installed.")
+
+
+def test_restricted_parse(test_html, test_rules):
+    require("lxml")
+    expected = Scraper(html_doc=test_html, rules=test_rules).scrape()
+
+    options = ScraperOptions(parser="lxml", restrict_parse=True)
+    scraper = Scraper(html_doc=test_html, rules=test_rules, options=options)
+
+    assert scraper.scrape() == expected
+    assert scraper._parser.find("script") is None
+
+
+@pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+@pytest.mark.parametrize(
+    "html, rule",
+    [
+        ("<ul><li>a<li>b</ul><p>after</p>", {"element": "li"}),
+        (
+            "<div class=x><p>a</div>b<span>c</span>",
+            {"element": "p", "child_of": {"class_name": "x"}},
+        ),
+        ("<table><tr><td>a<td>b</table>c<div>d", {"element": "td"}),
+        ("<div class=x><b>a<i>b</div>c</b>d", {"element": "b"}),
+    ],
+)
+def test_restricted_parse_of_malformed_markup(parser, html, rule):
+    require(parser)
+    rules = [ScraperRule(target="values", attributes=rule)]
+
+    options = ScraperOptions(parser=parser)
+    expected = Scraper(html_doc=html, rules=rules, options=options).scrape()
+
+    options = ScraperOptions(parser=parser, restrict_parse=True)
+    assert Scraper(html_doc=html, rules=rules, options=options).scrape() == expected
+
+
+def test_html_parser_is_not_restricted(test_html, test_rules):
+    options = ScraperOptions(parser="html.parser", restrict_parse=True)
+    scraper = Scraper(html_doc=test_html, rules=test_rules, options=options)
+    scraper.scrape()
+
+    assert scraper._parser.find("script") is not None
+
+
+def test_rules_added_after_restricted_parse(test_html, test_rules):
+    require("lxml")
+    options = ScraperOptions(parser="lxml", restrict_parse=True)
+    scraper = Scraper(html_doc=test_html, rules=test_rules, options=options)
+    scraper.scrape()
+
+    # The document is parsed again for rules outside of the restricted tree.
+    scraper.add_rule(ScraperRule(target="all", attributes={"element": "a"}))
+    assert scraper.scrape()["all"] == ["More", "More", "Outside"]
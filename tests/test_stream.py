@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper, ScraperException, ScraperRule
+
+
+@pytest.fixture
+def test_html():
+    return """
+    <div class="links">
+        <a href="/home" rel="nofollow noopener">Home</a>
+        <a href="/faq">FAQ &amp; help</a>
+        <br>
+        <div class="links"><a href="/nested">Nested</a></div>
+    </div>
+    <p class="quote">'quoted'<script>var x = "<p>";</script></p>
+    <p>unclosed
+    """
+
+
+@pytest.fixture
+def test_rules():
+    return [
+        ScraperRule(
+            target="links",
+            attributes={
+                "element": "a",
+                "property": "href",
+                "child_of": {"element": "div", "class_name": "links"},
+            },
+        ),
+        ScraperRule(target="rel", attributes={"element": "a", "property": "rel"}),
+        ScraperRule(target="texts", attributes={"element": "a"}),
+        ScraperRule(target="paragraphs", attributes={"element": "p"}),
+    ]
+
+
+def collect(pairs):
+    result = {}
+    for target, value in pairs:
+        result.setdefault(target, []).append(value)
+
+    return result
+
+
+def test_stream_matches_scrape(test_html, test_rules):
+    options = ScraperOptions(parser="html.parser", add_escapes=True)
+    scraper = Scraper(html_doc=test_html, rules=test_rules, options=options)
+
+    expected = scraper.scrape()
+    result = collect(scraper.scrape_stream(test_html, chunk_size=7))
+
+    assert result == expected
+    assert result["paragraphs"] == ["''quoted''", "unclosed"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_stream_decodes_references_like_html_parser(chunk_size):
+    html = (
+        "<div>&notanentity; &amp; &copy &#147;&#x41; a&b &#65</div>"
+        "<div title='&notin; &amp'>&#129; &#9999999999;</div>"
+    )
+    rules = [
+        ScraperRule(target="text", attributes={"element": "div"}),
+        ScraperRule(
+            target="titles", attributes={"element": "div", "property": "title"}
+        ),
+    ]
+
+    options = ScraperOptions(parser="html.parser")
+    scraper = Scraper(html_doc=html, rules=rules, options=options)
+
+    expected = scraper.scrape()
+    assert expected["text"][0] == "&notanentity & \xa9 \u201cA a&b A"
+    assert collect(scraper.scrape_stream(html, chunk_size=chunk_size)) == expected
+
+
+def test_stream_from_binary_file(test_html, test_rules):
+    scraper = Scraper(rules=test_rules)
+    source = io.BytesIO(test_html.encode("utf-8"))
+
+    result = collect(scraper.scrape_stream(source, chunk_size=16))
+
+    assert result["links"] == ["/home", "/faq", "/nested"]
+    assert result["rel"] == [["nofollow", "noopener"]]
+
+
+def test_stream_rejects_selectors(test_html):
+    scraper = Scraper(rules=[ScraperRule(target="links", select="div > a")])
+
+    with pytest.raises(ScraperException):
+        list(scraper.scrape_stream(test_html))
@@ -0,0 +1,111 @@
+import pickle
+
+import pytest
+
+from jaydee.options import ScraperOptions
+from jaydee.scraper import Scraper, ScraperRule
+from jaydee.transforms import compile_transforms
+
+
+@pytest.mark.parametrize(
+    "specs, value, expected",
+    [
+        (["normalize_whitespace"], "  Two \n\t words ", "Two words"),
+        (["upper"], "text", "TEXT"),
+        ([{"regex": r"(\d+)\.\d+"}], "Price: 12.99 EUR", "12"),
+        ([{"regex": {"pattern": r"(?P<cents>\d+)$", "group": "cents"}}], "12.99", "99"),
+        ([{"regex": r"\d+"}, "int"], "No price", None),
+        ([{"replace": [",", ""]}, "int"], "1,299", 1299),
+        (["float"], "12.5", 12.5),
+        (["int"], "12.5", None),
+        ([{"date": "%d.%m.%Y"}], "24.12.2024", "2024-12-24"),
+        ([{"date": "%d.%m.%Y %H:%M"}], "24.12.2024 18:30", "2024-12-24T18:30:00"),
+        (
+            [{"absolute_url": "https://example.com/a/"}],
+            "../b?c=1",
+            "https://example.com/b?c=1",
+        ),
+        (["escape"], "'quoted'", "''quoted''"),
+        (["upper"], ["a", "b"], ["A", "B"]),
+        # Text transforms pass values that are no longer text through.
+        (["int", "strip"], "12", 12),
+        (["float", {"regex": r"\d"}, {"replace": ["1", "2"]}], "1.5", 1.5),
+        (["int", "float"], "12", 12.0),
+    ],
+)
+def test_transforms(specs, value, expected):
+    assert compile_transforms(specs)(value) == expected
+
+
+@pytest.mark.parametrize(
+    "specs, message",
+    [
+        (["unknown"], "Unknown transform"),
+        ([{"unknown": 1}], "Unknown transform"),
+        ([{"regex": "(unclosed"}], "Invalid argument"),
+        ([{"regex": "a", "int": None}], "Invalid transform"),
+    ],
+)
+def test_invalid_transforms(specs, message):
+    with pytest.raises(ValueError, match=message):
+        ScraperRule(target="values", attributes={"element": "p"}, transforms=specs)
+
+
+def test_scraping_with_transforms(tmp_path):
+    html = """
+    <div class="product"><span class="price">Price: 1,299 EUR</span><a href="/p/1">More</a></div>
+    <div class="product"><span class="price">Sold out</span><a href="/p/2">More</a></div>
+    """
+    rules = [
+        ScraperRule(
+            target="prices",
+            attributes={"element": "span", "class_name": "price"},
+            transforms=[{"regex": r"[\d,]+"}, {"replace": [",", ""]}, "int"],
+        ),
+        ScraperRule(
+            target="links",
+            attributes={"element": "a", "property": "href"},
+            transforms=[{"absolute_url": "https://example.com"}],
+        ),
+    ]
+    expected = {
+        "prices": [1299, None],
+        "links": ["https://example.com/p/1", "https://example.com/p/2"],
+    }
+
+    scraper = Scraper(html_doc=html, rules=rules)
+    assert scraper.scrape() == expected
+    assert [value for _, value in scraper.scrape_iter()] == [
+        *expected["prices"],
+        *expected["links"],
+    ]
+
+    # Transforms are part of the JSON schema and survive pickling.
+    path = tmp_path / "rules.json"
+    scraper.to_json(str(path))
+    assert list(Scraper().from_json(str(path)).rules.values()) == rules
+    assert pickle.loads(pickle.dumps(rules[0])).pipeline("1,5") == 15
+
+
+def test_escapes_after_transforms():
+    rule = ScraperRule(
+        target="title", attributes={"element": "h1"}, transforms=["upper"]
+    )
+    scraper = Scraper(
+        html_doc="<h1>'quoted'</h1>",
+        rules=[rule],
+        options=ScraperOptions(add_escapes=True),
+    )
+
+    assert scraper.scrape() == {"title": ["''QUOTED''"]}
+
+
+def test_text_transforms_after_casts():
+    rule = ScraperRule(
+        target="counts",
+        attributes={"element": "span"},
+        transforms=["int", "normalize_whitespace", {"date": "%Y"}],
+    )
+
+    scraper = Scraper(html_doc="<span>12</span><span>many</span>", rules=[rule])
+    assert scraper.scrape() == {"counts": [12, None]}
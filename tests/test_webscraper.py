@@ -1,9 +1,18 @@
+import asyncio
+
 import pytest
 
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from jaydee.options import WebScraperOptions, MultithreadOptions
-from jaydee.webscraper import WebScraper
+from jaydee.options import (
+    WebScraperOptions,
+    MultithreadOptions,
+    RequestFilterOptions,
+    WaitForOptions,
+)
+from jaydee.stats import RequestStats
+from jaydee.webscraper import BrowserInstance, PagePool, WebScraper
+from jaydee.router import ScraperRouter
 from jaydee.scraper import Scraper
 
 
@@ -40,3 +49,321 @@ async def test_add_urls(webscraper):
 
     assert valid_url in webscraper.url_queue
     assert invalid_url not in webscraper.url_queue
+
+
+@pytest.mark.asyncio
+async def test_unrouted_pages_are_skipped(mock_scraper, mock_options):
+    router = ScraperRouter().add_prefix("https://example.com/", mock_scraper)
+    webscraper = WebScraper(
+        scraper=router,
+        urls=["https://example.com/page", "https://test.com/page"],
+        options=mock_options,
+    )
+
+    instance = MagicMock()
+    instance.scrape = AsyncMock(return_value={"data": "mocked"})
+    webscraper.browser_instances = [instance]
+
+    result = await webscraper.scrape_pages()
+
+    instance.scrape.assert_awaited_once_with("https://example.com/page")
+    assert result["results"] == [{"data": "mocked"}]
+    assert webscraper.total_skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_scrape_pages_iter_yields_pages_as_they_complete():
+    webscraper = WebScraper(
+        scraper=MagicMock(spec=Scraper),
+        urls=["https://slow.com", "https://fast.com", "https://broken.com"],
+        options=WebScraperOptions(
+            multithread_options=MultithreadOptions(pool_size=1, max_concurrent_tasks=2)
+        ),
+    )
+
+    in_flight = 0
+    most_in_flight = 0
+
+    async def scrape(url):
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+
+        try:
+            await asyncio.sleep(0.05 if url == "https://slow.com" else 0)
+            if url == "https://broken.com":
+                raise RuntimeError("page crashed")
+
+            return {"url": url}
+        finally:
+            in_flight -= 1
+
+    instance = MagicMock()
+    instance.scrape = AsyncMock(side_effect=scrape)
+    webscraper.browser_instances = [instance]
+
+    pages = [page async for page in webscraper.scrape_pages_iter()]
+
+    assert [page.url for page in pages][-1] == "https://slow.com"
+    assert {page.url: page.ok for page in pages} == {
+        "https://slow.com": True,
+        "https://fast.com": True,
+        "https://broken.com": False,
+    }
+    assert most_in_flight == 2
+    assert webscraper.total_success == 2
+    assert webscraper.total_failures == 1
+
+
+@pytest.mark.asyncio
+async def test_closing_scrape_pages_iter_cancels_pages_in_flight(mock_options):
+    webscraper = WebScraper(
+        scraper=MagicMock(spec=Scraper),
+        urls=["https://hang.com", "https://fast.com"],
+        options=mock_options,
+    )
+
+    hanging = asyncio.Event()
+
+    async def scrape(url):
+        if url == "https://hang.com":
+            await hanging.wait()
+
+        return {"url": url}
+
+    instance = MagicMock()
+    instance.scrape = AsyncMock(side_effect=scrape)
+    webscraper.browser_instances = [instance]
+
+    pages = webscraper.scrape_pages_iter()
+    page = await pages.__anext__()
+    await pages.aclose()
+
+    assert page.url == "https://fast.com"
+    assert webscraper.url_queue == []
+
+
+@pytest.mark.asyncio
+async def test_free_workers_take_pages_from_the_shared_queue():
+    webscraper = WebScraper(
+        scraper=MagicMock(spec=Scraper),
+        urls=[f"https://example.com/{i}" for i in range(6)] + ["https://slow.com"],
+        options=WebScraperOptions(
+            multithread_options=MultithreadOptions(pool_size=2, max_concurrent_tasks=1)
+        ),
+    )
+
+    async def scrape(url):
+        await asyncio.sleep(0.1 if url == "https://slow.com" else 0.001)
+        return {"url": url}
+
+    slow, fast = MagicMock(), MagicMock()
+    slow.scrape = AsyncMock(side_effect=scrape)
+    fast.scrape = AsyncMock(side_effect=scrape)
+    webscraper.browser_instances = [slow, fast]
+
+    result = await webscraper.scrape_pages()
+
+    assert result["success"] == 7
+    slow.scrape.assert_awaited_once_with("https://slow.com")
+    assert fast.scrape.await_count == 6
+
+    stats = webscraper.pool_stats
+    assert [instance.pages for instance in stats.instances] == [1, 6]
+    assert stats.peak_queue_depth <= stats.queue_size == 2
+    assert all(0 < utilization <= 1 for utilization in stats.utilization())
+
+
+def test_request_filter_blocks_requests():
+    options = RequestFilterOptions(
+        resource_types=["image", "font"],
+        url_patterns=[r"/analytics\.js$"],
+        blocked_domains=["tracker.com"],
+    )
+
+    assert options.blocks("https://example.com/logo.png", "image")
+    assert options.blocks("https://cdn.example.com/analytics.js", "script")
+    assert options.blocks("https://pixel.tracker.com/p", "xhr")
+    assert options.blocks("https://tracker.com/p", "fetch")
+
+    assert not options.blocks("https://example.com/app.js", "script")
+    assert not options.blocks("https://nottracker.com/p", "xhr")
+    # The page itself is always loaded.
+    assert not options.blocks("https://tracker.com/", "document")
+
+    with pytest.raises(ValueError):
+        RequestFilterOptions(url_patterns=["("])
+
+
+def test_static_request_filter():
+    options = RequestFilterOptions.static(blocked_domains=["tracker.com"])
+
+    for resource_type in ["image", "font", "media", "stylesheet"]:
+        assert options.blocks("https://example.com/resource", resource_type)
+
+    assert options.blocks("https://tracker.com/t.js", "script")
+    assert not options.blocks("https://example.com/app.js", "script")
+    assert not options.blocks("https://example.com/api", "fetch")
+
+
+@pytest.mark.asyncio
+async def test_request_filter_routes_context_requests():
+    context = MagicMock()
+    context.route = AsyncMock()
+    stats = RequestStats()
+
+    await RequestFilterOptions().async_install(context, stats)
+    context.route.assert_not_awaited()
+
+    await RequestFilterOptions(resource_types=["image"]).async_install(context, stats)
+    handle = context.route.await_args.args[1]
+
+    for url, resource_type in [
+        ("https://example.com/", "document"),
+        ("https://example.com/a.png", "image"),
+        ("https://example.com/b.png", "image"),
+    ]:
+        route = MagicMock()
+        route.request.url = url
+        route.request.resource_type = resource_type
+        route.abort = AsyncMock()
+        route.continue_ = AsyncMock()
+
+        await handle(route)
+
+        assert route.abort.await_count == (resource_type == "image")
+
+    assert stats.blocked == 2
+    assert stats.allowed == 1
+    assert stats.blocked_by_type == {"image": 2}
+
+
+@pytest.mark.asyncio
+async def test_contexts_share_browser_processes(monkeypatch):
+    playwright = MagicMock()
+    playwright.stop = AsyncMock()
+
+    def launch(**kwargs):
+        browser = MagicMock()
+        browser.new_context = AsyncMock(return_value=MagicMock(close=AsyncMock()))
+        browser.close = AsyncMock()
+        return browser
+
+    playwright.chromium.launch = AsyncMock(side_effect=launch)
+
+    driver = MagicMock()
+    driver.start = AsyncMock(return_value=playwright)
+    monkeypatch.setattr("jaydee.webscraper.async_playwright", lambda: driver)
+
+    webscraper = WebScraper(
+        scraper=MagicMock(spec=Scraper),
+        options=WebScraperOptions(
+            multithread_options=MultithreadOptions(pool_size=5, browser_processes=2)
+        ),
+    )
+    await webscraper.start()
+
+    assert driver.start.await_count == 1
+    assert playwright.chromium.launch.await_count == 2
+
+    browsers = {id(instance.browser) for instance in webscraper.browser_instances}
+    assert len(webscraper.browser_instances) == 5
+    assert len(browsers) == 2
+
+    shared = webscraper.browser_instances[0].browser
+    await webscraper.quit()
+
+    assert shared.new_context.await_count == 3
+    shared.close.assert_awaited_once()
+    playwright.stop.assert_awaited_once()
+
+    with pytest.raises(ValueError):
+        MultithreadOptions(browser_processes=0)
+
+
+def mock_page():
+    page = MagicMock()
+    page.is_closed.return_value = False
+    page.add_init_script = AsyncMock()
+    page.evaluate = AsyncMock()
+    page.goto = AsyncMock()
+    page.close = AsyncMock()
+    page.content = AsyncMock(return_value="<html></html>")
+    return page
+
+
+@pytest.mark.asyncio
+async def test_pooled_pages_are_reused_and_recycled(mock_scraper):
+    pages = []
+
+    def new_page():
+        pages.append(mock_page())
+        return pages[-1]
+
+    context = MagicMock()
+    context.new_page = AsyncMock(side_effect=new_page)
+    context.close = AsyncMock()
+
+    instance = BrowserInstance(
+        scraper=mock_scraper,
+        max_concurrent_tasks=1,
+        wait_for_options=WaitForOptions(),
+        page_reuse_limit=2,
+    )
+    instance.browser_context = context
+    instance.page_pool = PagePool(context, size=1, max_uses=2)
+    await instance.page_pool.fill()
+
+    for _ in range(3):
+        assert await instance.scrape("https://example.com") == {"data": "mocked"}
+
+    pool = instance.page_pool
+    assert pool.created == 2
+    assert pool.reused == 2
+
+    first = pages[0]
+    first.add_init_script.assert_awaited_once()
+    first.goto.assert_any_await("about:blank")
+    first.evaluate.assert_awaited_once()
+    first.close.assert_awaited_once()
+
+    await instance.clean_up()
+    context.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_pages_that_cant_be_replaced_fail_the_scrape(mock_scraper):
+    def new_page():
+        if context.new_page.await_count > 1:
+            raise RuntimeError("browser crashed")
+
+        page = mock_page()
+        page.goto = AsyncMock(side_effect=RuntimeError("navigation failed"))
+        return page
+
+    context = MagicMock()
+    context.new_page = AsyncMock(side_effect=new_page)
+
+    instance = BrowserInstance(
+        scraper=mock_scraper,
+        max_concurrent_tasks=1,
+        wait_for_options=WaitForOptions(),
+        page_reuse_limit=1,
+    )
+    instance.browser_context = context
+    instance.page_pool = PagePool(context, size=1, max_uses=1)
+    await instance.page_pool.fill()
+
+    webscraper = WebScraper(
+        scraper=mock_scraper,
+        urls=["https://example.com", "https://test.com", "https://other.com"],
+        options=WebScraperOptions(
+            multithread_options=MultithreadOptions(pool_size=1, max_concurrent_tasks=1)
+        ),
+    )
+    webscraper.browser_instances = [instance]
+
+    result = await asyncio.wait_for(webscraper.scrape_pages(), timeout=5)
+
+    assert result["failures"] == 3
+    assert context.new_page.await_count == 3